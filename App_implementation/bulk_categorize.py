@@ -0,0 +1,137 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from transaction_categorizer import TransactionCategorizer
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, 'transaction_categorizer_model.pkl')
+PREPROCESSOR_PATH = os.path.join(BASE_DIR, 'transaction_preprocessor.pkl')
+
+# Categorizer owned by each worker process, loaded once by _init_worker
+_worker_categorizer = None
+
+
+def _init_worker(model_path, preprocessor_path):
+    """Load the model and preprocessor once per worker process."""
+    global _worker_categorizer
+    _worker_categorizer = TransactionCategorizer(model_path, preprocessor_path)
+
+
+def _categorize_file(task):
+    """Categorize one CSV file inside a worker process."""
+    input_file, output_file, chunksize = task
+    start_time = time.perf_counter()
+    rows = _worker_categorizer.categorize_csv_chunked(input_file, output_file, chunksize)
+    return input_file, output_file, rows, time.perf_counter() - start_time
+
+
+def output_path_for(input_file, output_dir=None):
+    """Return the categorized output path for an input CSV file."""
+    root, _ = os.path.splitext(os.path.basename(input_file))
+    directory = output_dir if output_dir else os.path.dirname(input_file)
+    return os.path.join(directory, f"{root}_categorized.csv")
+
+
+def output_paths_for(input_files, output_dir=None):
+    """
+    Return a distinct categorized output path for each input CSV file.
+
+    Inputs that would write the same output (files sharing a basename with
+    output_dir, or a file listed twice) get their position in the list as
+    a suffix, so no two workers write the same file.
+    """
+    paths = []
+    taken = set()
+    for index, input_file in enumerate(input_files):
+        path = output_path_for(input_file, output_dir)
+        if os.path.abspath(path) in taken:
+            root, extension = os.path.splitext(path)
+            path = f"{root}_{index}{extension}"
+        taken.add(os.path.abspath(path))
+        paths.append(path)
+    return paths
+
+
+def merge_outputs(output_files, merged_output, chunksize=50000):
+    """Concatenate categorized CSV files into one file, in the given order."""
+    first = True
+    for output_file in output_files:
+        for chunk in pd.read_csv(output_file, chunksize=chunksize):
+            chunk.to_csv(merged_output, mode='w' if first else 'a', header=first, index=False)
+            first = False
+    print(f"Merged {len(output_files)} files into {merged_output}")
+
+
+def categorize_many(input_files, output_dir=None, workers=None, chunksize=50000,
+                    model_path=MODEL_PATH, preprocessor_path=PREPROCESSOR_PATH,
+                    merged_output=None):
+    """
+    Categorize many CSV files in parallel across a process pool.
+
+    Each file is a shard handled by one worker; every worker loads the pickled
+    model and preprocessor once and reuses them for all the files it receives.
+
+    Args:
+        input_files: List of paths to input CSV files
+        output_dir: Directory for the categorized files (default: next to each input)
+        workers: Number of worker processes (default: number of CPUs)
+        chunksize: Number of rows categorized at a time within a file
+        model_path: Path to the trained model pickle file
+        preprocessor_path: Path to the preprocessor pickle file
+        merged_output: Optional path of a single CSV combining all results in input order
+
+    Returns:
+        List of (input_file, output_file, rows) tuples in the order of input_files;
+        rows is None for files that failed
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [(input_file, output_file, chunksize)
+             for input_file, output_file in zip(input_files, output_paths_for(input_files, output_dir))]
+
+    results = []
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, preprocessor_path)) as executor:
+        # map() yields results in submission order, whatever order workers finish in
+        for input_file, output_file, rows, elapsed in executor.map(_categorize_file, tasks):
+            status = f"{rows} rows in {elapsed:.2f}s" if rows is not None else "failed"
+            print(f"{input_file}: {status}")
+            results.append((input_file, output_file, rows))
+
+    total_rows = sum(rows for _, _, rows in results if rows is not None)
+    elapsed = time.perf_counter() - start_time
+    print(f"Categorized {total_rows} transactions from {len(results)} files in {elapsed:.2f}s")
+
+    if merged_output:
+        merge_outputs([output_file for _, output_file, rows in results if rows is not None],
+                      merged_output, chunksize)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-categorize transaction CSV files in bulk.")
+    parser.add_argument('input_files', nargs='+', help="CSV files to categorize")
+    parser.add_argument('--output-dir', help="Directory for categorized files")
+    parser.add_argument('--merged-output', help="Also write all results, in order, to this CSV")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--chunksize', type=int, default=50000, help="Rows per chunk within a file")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path to the model pickle file")
+    parser.add_argument('--preprocessor', default=PREPROCESSOR_PATH,
+                        help="Path to the preprocessor pickle file")
+    args = parser.parse_args()
+
+    results = categorize_many(args.input_files, args.output_dir, args.workers, args.chunksize,
+                              args.model, args.preprocessor, args.merged_output)
+
+    if any(rows is None for _, _, rows in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
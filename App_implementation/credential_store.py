@@ -0,0 +1,213 @@
+import abc
+import argparse
+import os
+import sqlite3
+import sys
+
+# Modules shared with Website_Deploy live in the repository's shared directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+from shared_instances import SharedInstances
+from sqlite_store import SQLiteStore
+
+# Credentials file written by earlier versions: hashed_credentials,name,client_id,username
+LEGACY_CREDENTIALS_FILE = 'user_credentials.txt'
+
+
+class CredentialStore(abc.ABC):
+    """
+    Interface of the user credential backends.
+
+    Credentials are identified by their hash (see password_hashing), which is
+    salted, so accounts are looked up by username; usernames are unique
+    across new accounts.
+    """
+
+    @abc.abstractmethod
+    def add(self, hashed_credentials, name, client_id, username):
+        """
+        Store a new account.
+
+        Returns:
+            False if the username or the credentials already exist, True otherwise
+        """
+
+    @abc.abstractmethod
+    def username_exists(self, username):
+        """Return True if an account uses this username."""
+
+    @abc.abstractmethod
+    def hashes_for(self, username):
+        """Return the credential hashes stored for a username."""
+
+    @abc.abstractmethod
+    def replace_hash(self, old_hash, new_hash):
+        """Replace a credential hash, for example after rehashing it with new parameters."""
+
+    @abc.abstractmethod
+    def __len__(self):
+        """Return the number of stored accounts."""
+
+
+class SQLiteCredentialStore(SQLiteStore, CredentialStore):
+    """
+    Credentials in SQLite, looked up through indexes.
+
+    Logins and signups cost one index probe, however many accounts there are.
+    WAL mode lets logins read while a signup is being written. The username
+    index cannot be unique, as files of earlier versions may repeat a
+    username, so a signup checks and inserts its username inside one
+    BEGIN IMMEDIATE transaction: concurrent signups of the same username, in
+    this process or another, cannot both succeed.
+    """
+
+    SCHEMA = (
+        '''
+        CREATE TABLE IF NOT EXISTS credentials (
+            hashed_credentials TEXT PRIMARY KEY,
+            name TEXT,
+            client_id TEXT,
+            username TEXT NOT NULL
+        ) WITHOUT ROWID
+        ''',
+        # Not unique: files written by earlier versions may repeat a username
+        "CREATE INDEX IF NOT EXISTS credentials_by_username ON credentials (username)",
+    )
+
+    def __init__(self, db_path='credentials.db'):
+        super().__init__(db_path)
+
+    def add(self, hashed_credentials, name, client_id, username):
+        with self._lock:
+            try:
+                with self._conn:
+                    # Takes the write lock before the check, so no other signup can
+                    # insert the username in between
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    if self._conn.execute("SELECT 1 FROM credentials WHERE username = ?",
+                                          (username,)).fetchone():
+                        return False
+                    self._conn.execute(
+                        "INSERT INTO credentials (hashed_credentials, name, client_id, username) "
+                        "VALUES (?, ?, ?, ?)",
+                        (hashed_credentials, name, client_id, username),
+                    )
+                return True
+            except sqlite3.IntegrityError:
+                # The primary key rejects credentials that are already stored
+                return False
+
+    def add_many(self, records):
+        """
+        Store accounts in one transaction, keeping the ones already stored.
+
+        Args:
+            records: Iterable of (hashed_credentials, name, client_id, username)
+
+        Returns:
+            Number of accounts added
+        """
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO credentials (hashed_credentials, name, client_id, username) "
+                "VALUES (?, ?, ?, ?)",
+                records,
+            )
+            return self._conn.total_changes - before
+
+    def username_exists(self, username):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM credentials WHERE username = ?",
+                                     (username,)).fetchone()
+            return row is not None
+
+    def hashes_for(self, username):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hashed_credentials FROM credentials WHERE username = ?",
+                (username,)).fetchall()
+            return [row[0] for row in rows]
+
+    def replace_hash(self, old_hash, new_hash):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE credentials SET hashed_credentials = ? WHERE hashed_credentials = ?",
+                (new_hash, old_hash))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM credentials").fetchone()[0]
+
+
+def read_legacy_credentials(path=LEGACY_CREDENTIALS_FILE):
+    """
+    Yield the accounts of a credentials text file.
+
+    Names may contain commas, so the hash is the first field and the client
+    id and username are the last two.
+
+    Yields:
+        (hashed_credentials, name, client_id, username)
+    """
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.rstrip('\n').split(',')
+            if len(fields) < 4:
+                continue
+            yield fields[0], ','.join(fields[1:-2]), fields[-2], fields[-1]
+
+
+def migrate_legacy_credentials(store, path=LEGACY_CREDENTIALS_FILE):
+    """
+    Copy the accounts of a credentials text file into a store.
+
+    Safe to run repeatedly; accounts already in the store are kept as they are.
+
+    Returns:
+        Number of accounts added
+    """
+    if not os.path.exists(path):
+        return 0
+    return store.add_many(read_legacy_credentials(path))
+
+
+_stores = SharedInstances()
+
+
+def get_credential_store(db_path='credentials.db', legacy_path=LEGACY_CREDENTIALS_FILE):
+    """
+    Return the process-wide credential store.
+
+    A new database is filled from the legacy credentials file, if there is one.
+    """
+    def create():
+        store = SQLiteCredentialStore(db_path)
+        if len(store) == 0:
+            added = migrate_legacy_credentials(store, legacy_path)
+            if added:
+                print(f"Migrated {added} accounts from {legacy_path} to {db_path}")
+        return store
+
+    return _stores.get(create)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migrate accounts from the credentials text file to the SQLite credential store.")
+    parser.add_argument('legacy_path', nargs='?', default=LEGACY_CREDENTIALS_FILE,
+                        help="Credentials text file (default: %(default)s)")
+    parser.add_argument('db_path', nargs='?', default='credentials.db',
+                        help="SQLite database to fill (default: %(default)s)")
+    args = parser.parse_args()
+
+    store = SQLiteCredentialStore(args.db_path)
+    added = migrate_legacy_credentials(store, args.legacy_path)
+    print(f"Migrated {added} accounts; {len(store)} accounts in {args.db_path}")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
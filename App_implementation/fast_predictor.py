@@ -0,0 +1,357 @@
+import argparse
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, 'transaction_categorizer_model.pkl')
+PREPROCESSOR_PATH = os.path.join(BASE_DIR, 'transaction_preprocessor.pkl')
+FAST_MODEL_PATH = os.path.join(BASE_DIR, 'transaction_categorizer_model.npz')
+
+# LightGBM missing-value handling, as stored in the exported node arrays
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+MISSING_TYPES = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+
+# Values LightGBM treats as zero
+ZERO_THRESHOLD = 1e-35
+
+
+def _plain_array(values):
+    """Return values as an array that np.load can read without pickle."""
+    values = np.asarray(values)
+    return values.astype(str) if values.dtype == object else values
+
+
+def _export_preprocessor(preprocessor, arrays):
+    """Flatten a fitted ColumnTransformer of StandardScaler and OneHotEncoder steps."""
+    numeric_columns, categorical_columns = [], []
+    means, scales = [], []
+
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == 'remainder':
+            continue
+        steps = getattr(transformer, 'named_steps', {name: transformer})
+        scaler = steps.get('scaler')
+        onehot = steps.get('onehot')
+
+        if scaler is not None:
+            numeric_columns.extend(columns)
+            means.extend(scaler.mean_ if scaler.with_mean else np.zeros(len(columns)))
+            scales.extend(scaler.scale_ if scaler.with_std else np.ones(len(columns)))
+        elif onehot is not None:
+            if onehot.drop is not None or onehot.handle_unknown != 'ignore':
+                raise ValueError("Only OneHotEncoder(handle_unknown='ignore') without drop is supported")
+            for i, column in enumerate(columns):
+                arrays[f'categories_{len(categorical_columns)}'] = _plain_array(onehot.categories_[i])
+                categorical_columns.append(column)
+        else:
+            raise ValueError(f"Unsupported preprocessing step in {name!r}")
+
+    arrays['numeric_columns'] = np.array(numeric_columns, dtype=str)
+    arrays['categorical_columns'] = np.array(categorical_columns, dtype=str)
+    arrays['means'] = np.array(means, dtype=np.float64)
+    arrays['scales'] = np.array(scales, dtype=np.float64)
+
+
+def _tree_depth(node):
+    """Return the depth of a dumped LightGBM tree."""
+    if 'leaf_value' in node:
+        return 0
+    return 1 + max(_tree_depth(node['left_child']), _tree_depth(node['right_child']))
+
+
+def _export_trees(model, arrays):
+    """
+    Flatten the trees of a fitted LGBMClassifier into node arrays.
+
+    Every tree is laid out as a perfect binary tree of the model's maximum
+    depth (children of slot i are 2i+1 and 2i+2), so all rows take the same
+    number of steps and no per-level bookkeeping is needed. Leaves above the
+    maximum depth are pushed down through pass-through nodes that always go
+    left.
+    """
+    dump = model.booster_.dump_model()
+    trees = [tree['tree_structure'] for tree in dump['tree_info']]
+    depth = max(max(_tree_depth(tree) for tree in trees), 1)
+    n_internal, n_leaves = 2 ** depth - 1, 2 ** depth
+
+    split_feature = np.zeros((len(trees), n_internal), dtype=np.int32)
+    threshold = np.full((len(trees), n_internal), np.inf)
+    missing_type = np.full((len(trees), n_internal), MISSING_NONE, dtype=np.int8)
+    default_left = np.ones((len(trees), n_internal), dtype=bool)
+    leaf_value = np.zeros((len(trees), n_leaves))
+
+    def add(t, node, slot):
+        if slot >= n_internal:
+            leaf_value[t, slot - n_internal] = node['leaf_value']
+            return
+        if 'leaf_value' in node:
+            # Pass-through slot: threshold +inf always goes left
+            add(t, node, 2 * slot + 1)
+            return
+
+        if node['decision_type'] != '<=':
+            raise ValueError("Only numerical '<=' splits are supported")
+        split_feature[t, slot] = node['split_feature']
+        threshold[t, slot] = node['threshold']
+        missing_type[t, slot] = MISSING_TYPES[node['missing_type']]
+        default_left[t, slot] = node['default_left']
+        add(t, node['left_child'], 2 * slot + 1)
+        add(t, node['right_child'], 2 * slot + 2)
+
+    for t, tree in enumerate(trees):
+        add(t, tree, 0)
+
+    arrays['split_feature'] = split_feature
+    arrays['threshold'] = threshold
+    arrays['missing_type'] = missing_type
+    arrays['default_left'] = default_left
+    arrays['leaf_value'] = leaf_value
+    arrays['trees_per_iteration'] = np.array(dump['num_tree_per_iteration'])
+    arrays['classes'] = _plain_array(model.classes_)
+
+
+def export_model(model_path=MODEL_PATH, preprocessor_path=PREPROCESSOR_PATH,
+                 output_path=FAST_MODEL_PATH):
+    """
+    Export the pickled preprocessor and model into a NumPy-only .npz file.
+
+    Encoders become lookup arrays and the LightGBM trees become flat node
+    arrays, so inference needs neither pandas, scikit-learn nor LightGBM.
+
+    Args:
+        model_path: Path to the trained model pickle file
+        preprocessor_path: Path to the preprocessor pickle file
+        output_path: Path of the .npz file to write
+
+    Returns:
+        FastPredictor loaded from the exported arrays
+    """
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    with open(preprocessor_path, 'rb') as f:
+        preprocessor = pickle.load(f)
+
+    arrays = {}
+    _export_preprocessor(preprocessor, arrays)
+    _export_trees(model, arrays)
+    np.savez_compressed(output_path, **arrays)
+    print(f"Exported model to {output_path}")
+    return FastPredictor(arrays)
+
+
+class FastPredictor:
+    """
+    NumPy-only predictor for the exported transaction categorizer model.
+
+    Accepts a single feature dictionary or a batch (DataFrame or dictionary of
+    columns) and reproduces preprocessor.transform followed by model.predict.
+    """
+
+    def __init__(self, arrays):
+        """
+        Initialize the predictor from exported arrays.
+
+        Args:
+            arrays: Mapping of array names to arrays, as written by export_model
+        """
+        self.numeric_columns = [str(column) for column in arrays['numeric_columns']]
+        self.categorical_columns = [str(column) for column in arrays['categorical_columns']]
+        self.categories = [arrays[f'categories_{i}'] for i in range(len(self.categorical_columns))]
+        self.means = arrays['means']
+        self.scales = arrays['scales']
+
+        # Node arrays are stored flat; tree t's slots start at t * n_internal
+        n_trees, self.n_internal = arrays['split_feature'].shape
+        self.depth = int(np.log2(self.n_internal + 1))
+        self.split_feature = arrays['split_feature'].ravel()
+        self.threshold = arrays['threshold'].ravel()
+        self.missing_type = arrays['missing_type'].ravel()
+        self.default_left = arrays['default_left'].ravel()
+        self.leaf_value = arrays['leaf_value'].ravel()
+        self.tree_offsets = np.arange(n_trees) * self.n_internal
+        self.leaf_offsets = np.arange(n_trees) * (self.n_internal + 1)
+        self.n_trees = n_trees
+        self.trees_per_iteration = int(arrays['trees_per_iteration'])
+        self.classes = arrays['classes'].astype(object)
+        
+        # The common case needs no per-node missing-value handling
+        self.only_missing_none = bool((self.missing_type == MISSING_NONE).all())
+
+    @classmethod
+    def load(cls, path=FAST_MODEL_PATH):
+        """Load a predictor from an exported .npz file."""
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls({name: arrays[name] for name in arrays.files})
+
+    def transform(self, features):
+        """
+        Build the model input matrix, as preprocessor.transform does.
+
+        Args:
+            features: Feature dictionary for one row, or DataFrame / dictionary of columns
+
+        Returns:
+            2-D float64 NumPy array
+        """
+        if isinstance(features, pd.DataFrame):
+            column = lambda name: features[name].to_numpy()
+            n = len(features)
+        else:
+            column = lambda name: np.atleast_1d(np.asarray(features[name], dtype=object))
+            n = len(column(self.numeric_columns[0]))
+
+        parts = []
+        if self.numeric_columns:
+            numeric = np.column_stack([column(name).astype(np.float64)
+                                       for name in self.numeric_columns])
+            parts.append((numeric - self.means) / self.scales)
+
+        for name, categories in zip(self.categorical_columns, self.categories):
+            values = column(name).astype(object)
+            parts.append((values[:, None] == categories.astype(object)[None, :]).astype(np.float64))
+
+        return np.hstack(parts) if parts else np.empty((n, 0))
+
+    def raw_scores(self, X, block_size=1024):
+        """
+        Return the raw per-class scores for a model input matrix.
+
+        Args:
+            X: 2-D float64 model input matrix
+            block_size: Rows evaluated at a time, bounding temporary memory
+
+        Returns:
+            2-D array of shape (rows, classes)
+        """
+        n = X.shape[0]
+        k = self.trees_per_iteration
+        scores = np.zeros((n, k))
+
+        for start in range(0, n, block_size):
+            block = X[start:start + block_size]
+            rows = np.arange(len(block))[:, None]
+            if self.only_missing_none:
+                # LightGBM reads NaN as 0.0 when a split has no missing handling
+                block = np.where(np.isnan(block), 0.0, block)
+
+            # Every (row, tree) pair moves down one level per step
+            slots = np.zeros((len(block), self.n_trees), dtype=np.int64)
+            for _ in range(self.depth):
+                node = self.tree_offsets + slots
+                value = block[rows, self.split_feature[node]]
+                if self.only_missing_none:
+                    go_left = value <= self.threshold[node]
+                else:
+                    go_left = self._go_left(value, node)
+                slots = 2 * slots + 2 - go_left
+
+            leaves = self.leaf_value[self.leaf_offsets + slots - self.n_internal]
+
+            # Add trees in order, as LightGBM does, so scores match exactly
+            block_scores = scores[start:start + block_size]
+            for first_tree in range(0, self.n_trees, k):
+                block_scores += leaves[:, first_tree:first_tree + k]
+
+        return scores
+
+    def _go_left(self, value, node):
+        """Apply LightGBM's split decision, including missing-value handling."""
+        missing_type = self.missing_type[node]
+        is_nan = np.isnan(value)
+        value = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, value)
+        use_default = (((missing_type == MISSING_ZERO) & (np.abs(value) <= ZERO_THRESHOLD))
+                       | ((missing_type == MISSING_NAN) & is_nan))
+        return np.where(use_default, self.default_left[node], value <= self.threshold[node])
+
+    def predict(self, features):
+        """
+        Predict categories for a batch of transactions.
+
+        Args:
+            features: DataFrame or dictionary of feature columns
+
+        Returns:
+            NumPy object array of predicted categories
+        """
+        X = self.transform(features)
+        if X.shape[0] == 0:
+            return np.empty(0, dtype=object)
+        return self.classes[np.argmax(self.raw_scores(X), axis=1)]
+
+    def predict_one(self, features):
+        """Predict the category of a single transaction's feature dictionary."""
+        return self.predict(features)[0]
+
+
+def validate(predictor, model_path=MODEL_PATH, preprocessor_path=PREPROCESSOR_PATH,
+             n_rows=20000, seed=0):
+    """
+    Compare the predictor against the original pickles on random feature rows.
+
+    Args:
+        predictor: FastPredictor to check
+        model_path: Path to the trained model pickle file
+        preprocessor_path: Path to the preprocessor pickle file
+        n_rows: Number of random rows to compare
+        seed: Random seed
+
+    Returns:
+        Number of rows where the predictions differ
+    """
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    with open(preprocessor_path, 'rb') as f:
+        preprocessor = pickle.load(f)
+
+    rng = np.random.default_rng(seed)
+    transaction_types = ['UPI', 'CARD_PAYMENT', 'IMPS', 'INTEREST', 'REFUND', 'CMS', 'OTHER']
+    amount = np.round(rng.choice([-1, 1], n_rows) * rng.lognormal(5, 2, n_rows), 2)
+    round_amount = rng.random(n_rows) < 0.1
+    amount[round_amount] = np.round(amount[round_amount], -1)
+    day = rng.integers(0, 7, n_rows)
+    has_payee = rng.integers(0, 2, n_rows)
+    transaction_type = rng.choice(transaction_types, n_rows)
+    features = pd.DataFrame({
+        'TransactionType': transaction_type,
+        'HasPayee': has_payee,
+        'TransactionAmount': amount,
+        'DayOfWeek': day,
+        'IsWeekend': (day >= 5).astype(int),
+        'Month': rng.integers(1, 13, n_rows),
+        'IsRoundAmount': (np.abs(amount) % 10 == 0).astype(int),
+        'is_small_upi_no_payee': ((transaction_type == 'UPI') & (has_payee == 0)
+                                  & (np.abs(amount) < 200)).astype(int),
+        'is_upi_with_payee': ((transaction_type == 'UPI') & (has_payee == 1)).astype(int),
+        'is_large_amount': (np.abs(amount) > 200).astype(int),
+    })
+
+    expected = model.predict(preprocessor.transform(features))
+    actual = predictor.predict(features)
+    mismatches = int((expected != actual).sum())
+
+    single = [predictor.predict_one(row) for row in features.head(200).to_dict('records')]
+    mismatches += int((expected[:200] != np.array(single, dtype=object)).sum())
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and validate the NumPy-only model.")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path to the model pickle file")
+    parser.add_argument('--preprocessor', default=PREPROCESSOR_PATH,
+                        help="Path to the preprocessor pickle file")
+    parser.add_argument('--output', default=FAST_MODEL_PATH, help="Path of the .npz file to write")
+    parser.add_argument('--rows', type=int, default=20000, help="Rows to validate against")
+    args = parser.parse_args()
+
+    export_model(args.model, args.preprocessor, args.output)
+    predictor = FastPredictor.load(args.output)
+    mismatches = validate(predictor, args.model, args.preprocessor, args.rows)
+    print(f"Validation: {mismatches} mismatches against the original pickles")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+
+# Modules shared with Website_Deploy live in the repository's shared directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+from shared_instances import SharedInstances
+from sqlite_store import SQLiteStore
+
+# Metadata file written by earlier versions: {file_id: {username, filename, ...}}
+LEGACY_METADATA_FILE = 'pdf_metadata.json'
+
+COLUMNS = ['file_id', 'username', 'filename', 'original_filename', 'upload_date', 'file_size',
+           'cache_key']
+PLACEHOLDERS = ', '.join('?' * len(COLUMNS))
+
+
+class FileMetadataStore(SQLiteStore):
+    """
+    Metadata of uploaded PDF files in SQLite, indexed by username and upload date.
+
+    An upload is a single-row insert and a user's file list is a range scan
+    of the index, so neither depends on how many files other users have.
+    """
+
+    SCHEMA = (
+        '''
+        CREATE TABLE IF NOT EXISTS files (
+            file_id TEXT NOT NULL UNIQUE,
+            username TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            original_filename TEXT,
+            upload_date TEXT NOT NULL,
+            file_size INTEGER,
+            cache_key TEXT
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS files_by_user ON files (username, upload_date)",
+    )
+
+    def __init__(self, db_path='pdf_metadata.db'):
+        super().__init__(db_path)
+        with self._lock, self._conn:
+            # Databases created before cache keys were recorded
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(files)")]
+            if 'cache_key' not in columns:
+                self._conn.execute("ALTER TABLE files ADD COLUMN cache_key TEXT")
+
+    def add(self, username, filename, original_filename, file_size, cache_key=None):
+        """
+        Record an uploaded file.
+
+        Args:
+            username: Owner of the file
+            filename: Path of the saved upload
+            original_filename: Name the file was uploaded with
+            file_size: Size in bytes
+            cache_key: Table cache key of the upload, so the file can be
+                viewed again without asking for its password
+
+        Returns:
+            The new file id
+        """
+        file_id = str(uuid.uuid4())
+        upload_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO files ({', '.join(COLUMNS)}) VALUES ({PLACEHOLDERS})",
+                (file_id, username, filename, original_filename, upload_date, file_size, cache_key),
+            )
+        return file_id
+
+    def add_many(self, records):
+        """
+        Record files in one transaction, keeping the ones already stored.
+
+        Args:
+            records: Iterable of dictionaries with the COLUMNS
+
+        Returns:
+            Number of files added
+        """
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO files ({', '.join(COLUMNS)}) VALUES ({PLACEHOLDERS})",
+                ([record.get(column) for column in COLUMNS] for record in records),
+            )
+            return self._conn.total_changes - before
+
+    def get(self, file_id):
+        """Return a file's metadata as a dictionary, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM files WHERE file_id = ?", (file_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_for_user(self, username, limit=10, offset=0):
+        """
+        Return one page of a user's files, newest first.
+
+        Args:
+            username: Owner of the files
+            limit: Files per page
+            offset: Files to skip, e.g. page number * limit
+
+        Returns:
+            List of metadata dictionaries
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM files WHERE username = ? "
+                "ORDER BY upload_date DESC, rowid DESC LIMIT ? OFFSET ?",
+                (username, limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_for_user(self, username):
+        """Return how many files a user has uploaded."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files WHERE username = ?",
+                                      (username,)).fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+
+def read_legacy_metadata(path=LEGACY_METADATA_FILE):
+    """
+    Yield the files recorded in a metadata JSON file.
+
+    Yields:
+        Metadata dictionaries with the COLUMNS
+    """
+    with open(path, 'r') as f:
+        metadata = json.load(f)
+    for file_id, file_data in metadata.items():
+        yield {**file_data, 'file_id': file_id}
+
+
+def migrate_legacy_metadata(store, path=LEGACY_METADATA_FILE):
+    """
+    Copy the files of a metadata JSON file into a store.
+
+    Safe to run repeatedly; files already in the store are kept as they are.
+
+    Returns:
+        Number of files added
+    """
+    if not os.path.exists(path):
+        return 0
+    return store.add_many(read_legacy_metadata(path))
+
+
+_stores = SharedInstances()
+
+
+def get_file_metadata_store(db_path='pdf_metadata.db', legacy_path=LEGACY_METADATA_FILE):
+    """
+    Return the process-wide file metadata store.
+
+    A new database is filled from the legacy metadata file, if there is one.
+    """
+    def create():
+        store = FileMetadataStore(db_path)
+        if len(store) == 0:
+            added = migrate_legacy_metadata(store, legacy_path)
+            if added:
+                print(f"Migrated {added} files from {legacy_path} to {db_path}")
+        return store
+
+    return _stores.get(create)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migrate uploaded file metadata from the JSON file to the SQLite store.")
+    parser.add_argument('legacy_path', nargs='?', default=LEGACY_METADATA_FILE,
+                        help="Metadata JSON file (default: %(default)s)")
+    parser.add_argument('db_path', nargs='?', default='pdf_metadata.db',
+                        help="SQLite database to fill (default: %(default)s)")
+    args = parser.parse_args()
+
+    store = FileMetadataStore(args.db_path)
+    added = migrate_legacy_metadata(store, args.legacy_path)
+    print(f"Migrated {added} files; {len(store)} files in {args.db_path}")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from sqlite_store import SQLiteStore
+
+
+class FingerprintIndex(SQLiteStore):
+    """
+    An on-disk set of transaction fingerprints, one SQLite file per user.
+
+    Fingerprints are the primary key of a WITHOUT ROWID table, so checking
+    and recording a row is a single index probe however large the history
+    grows, and nothing has to be loaded into memory up front.
+    """
+
+    SCHEMA = (
+        '''
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            fingerprint INTEGER PRIMARY KEY,
+            statement TEXT,
+            added_at TEXT NOT NULL
+        ) WITHOUT ROWID
+        ''',
+    )
+
+    def insert_new(self, fingerprints, statement=None, before_commit=None):
+        """
+        Record fingerprints, reporting which ones were not known yet.
+
+        Everything happens in one transaction. before_commit, if given, is
+        called with the mask of new fingerprints before committing; if it
+        raises, nothing is recorded.
+
+        Args:
+            fingerprints: Iterable of int64 fingerprints
+            statement: Name of the statement the rows come from
+            before_commit: Optional callback storing the new rows
+
+        Returns:
+            List of booleans, True where the fingerprint was new
+        """
+        added_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            is_new = []
+            for fingerprint in fingerprints:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO fingerprints (fingerprint, statement, added_at) "
+                    "VALUES (?, ?, ?)",
+                    (int(fingerprint), statement, added_at),
+                )
+                is_new.append(cursor.rowcount == 1)
+            if before_commit is not None:
+                before_commit(is_new)
+            return is_new
+
+    def __contains__(self, fingerprint):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM fingerprints WHERE fingerprint = ?",
+                                     (int(fingerprint),)).fetchone()
+            return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
@@ -0,0 +1,221 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from ledger import get_ledger
+from pdf_extraction import PdfPasswordError, iter_row_batches
+from shared_instances import SharedInstances
+from sqlite_store import SQLiteStore
+from statement_normalizer import normalize_statement
+from table_cache import get_cache
+from working_copies import get_working_copies
+
+# Job states, in the order a job goes through them
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+def extract_statement(pdf_path, password=None, progress=None):
+    """
+    Extract and normalize the transaction table of a statement PDF.
+
+    Pages are read as row batches (see pdf_extraction.iter_row_batches) and
+    joined once every page is in.
+
+    Args:
+        pdf_path: Path to the PDF file, or its contents as bytes
+        password: Password for protected PDFs
+        progress: Optional callback called with (page number, page count,
+            rows found on the page) after each page
+
+    Returns:
+        Normalized DataFrame, or None if no table was found
+    """
+    batches = list(iter_row_batches(pdf_path, password, progress=progress))
+    if not batches:
+        return None
+    df = pd.concat(batches, ignore_index=True)
+
+    # Typed amounts, dates and transaction types, computed once per statement
+    return normalize_statement(df)
+
+
+class JobStore(SQLiteStore):
+    """
+    Persistent records of statement ingestion jobs, in SQLite.
+
+    Records outlive the browser session that submitted them, so progress and
+    results can be picked up again after a refresh.
+    """
+
+    SCHEMA = (
+        '''
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            pdf_path TEXT NOT NULL,
+            original_filename TEXT,
+            status TEXT NOT NULL,
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            rows_added INTEGER,
+            duplicates INTEGER,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS jobs_by_user ON jobs (username, created_at)",
+    )
+
+    def __init__(self, db_path='ingestion_jobs.db'):
+        super().__init__(db_path)
+
+    @staticmethod
+    def _now():
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def create(self, username, pdf_path, original_filename):
+        """Record a new queued job and return its id."""
+        job_id = str(uuid.uuid4())
+        now = self._now()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, username, pdf_path, original_filename, status, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, username, pdf_path, original_filename, QUEUED, now, now),
+            )
+        return job_id
+
+    def update(self, job_id, **fields):
+        """Update columns of a job record."""
+        fields['updated_at'] = self._now()
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+                               (*fields.values(), job_id))
+
+    def get(self, job_id):
+        """Return a job record as a dictionary, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_for_user(self, username, limit=10):
+        """Return a user's most recent jobs, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE username = ? ORDER BY created_at DESC LIMIT ?",
+                (username, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def fail_interrupted(self):
+        """Mark jobs left queued or running by a previous server process as failed."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, updated_at = ? WHERE status IN (?, ?)",
+                (FAILED, "Interrupted by a server restart; please upload again.", self._now(),
+                 QUEUED, RUNNING),
+            )
+
+
+class IngestionQueue:
+    """
+    Runs statement ingestion in background threads instead of the Streamlit script.
+
+    Each job extracts the statement (through the table cache), normalizes it
+    and appends it to the uploader's ledger, updating its JobStore record as
+    it goes. Page extraction itself fans out to worker processes, which read
+    encrypted statements from their decrypted working copy.
+    """
+
+    def __init__(self, store, workers=2, cache_dir='table_cache', ledger_dir='ledgers'):
+        """
+        Start the queue.
+
+        Args:
+            store: JobStore holding the job records
+            workers: Number of statements ingested at the same time
+            cache_dir: Directory of the extracted table cache
+            ledger_dir: Directory holding every user's ledger
+        """
+        self.store = store
+        self.table_cache = get_cache(cache_dir)
+        self.working_copies = get_working_copies()
+        self.ledger_dir = ledger_dir
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix='ingestion')
+
+    def submit(self, username, pdf_path, original_filename, password=None, cache_key=None,
+               data=None):
+        """
+        Queue a statement PDF for ingestion.
+
+        The password is only held in memory for the job and never stored.
+
+        Args:
+            username: Owner of the statement
+            pdf_path: Where the PDF is (or is being) saved
+            original_filename: Name of the file as uploaded
+            password: Password for protected PDFs
+            cache_key: Table cache key of the PDF, if already computed
+            data: Contents of the PDF, if the upload is still in memory; the
+                job extracts from them and does not wait for pdf_path to be written
+
+        Returns:
+            Job id
+        """
+        job_id = self.store.create(username, pdf_path, original_filename)
+        self._executor.submit(self._run, job_id, username, pdf_path, original_filename,
+                              password, cache_key, data)
+        return job_id
+
+    def _run(self, job_id, username, pdf_path, original_filename, password, cache_key, data):
+        """Ingest one statement and record the outcome."""
+        self.store.update(job_id, status=RUNNING, message="Extracting transactions")
+        try:
+            if cache_key is None:
+                cache_key = (self.table_cache.key_for_file(pdf_path, password) if data is None
+                             else self.table_cache.key_for_bytes(data, password))
+
+            df = self.table_cache.get(cache_key)
+            if df is None:
+                def progress(page_num, n_pages, rows):
+                    self.store.update(job_id, progress=page_num / n_pages if n_pages else 0,
+                                      message=f"Processed page {page_num} of {n_pages}")
+
+                # Checks the password before any page is parsed
+                source, source_password = self.working_copies.get(
+                    username, pdf_path if data is None else data, cache_key, password)
+                df = extract_statement(source, source_password, progress)
+                if df is None:
+                    self.store.update(job_id, status=FAILED, progress=1.0,
+                                      message="No tables found in the PDF.")
+                    return
+                self.table_cache.put(cache_key, df)
+
+            added, duplicates = get_ledger(username, self.ledger_dir).append(
+                df, source=original_filename)
+            self.store.update(job_id, status=DONE, progress=1.0, rows_added=added,
+                              duplicates=duplicates,
+                              message=f"Added {added} new transactions, skipped {duplicates} "
+                                      f"already in your history.")
+        except PdfPasswordError as e:
+            self.store.update(job_id, status=FAILED, message=f"{e}; please upload it again with the right password.")
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, message=f"Error extracting tables: {e}")
+
+
+_queues = SharedInstances()
+
+
+def get_queue(db_path='ingestion_jobs.db', workers=2):
+    """Return the process-wide IngestionQueue."""
+    def create():
+        store = JobStore(db_path)
+        # Jobs of a previous process can no longer finish
+        store.fail_interrupted()
+        return IngestionQueue(store, workers)
+
+    return _queues.get(create)
@@ -0,0 +1,127 @@
+import re
+import numpy as np
+import pandas as pd
+
+
+class KeywordMatcher:
+    """
+    A precompiled multi-pattern keyword matcher.
+
+    The ordered (label, terms) table is compiled once into a list of unique
+    search terms and a bitmask per label. A description is reduced to the
+    bitmask of terms it contains, and the comma-joined label string for each
+    distinct bitmask is built once and cached.
+    """
+
+    # Separator used when joining a column into one buffer; never part of a term
+    SEPARATOR = '\x00'
+
+    def __init__(self, slots):
+        """
+        Build the matcher.
+
+        Args:
+            slots: Ordered list of (label, terms) pairs. The label is emitted,
+                in slot order, when any of its terms occurs in the text.
+        """
+        self.slots = [(label, tuple(terms)) for label, terms in slots]
+
+        # Each distinct term is searched for once, whichever slots use it
+        self.terms = list(dict.fromkeys(term for _, terms in self.slots for term in terms))
+        if len(self.terms) > 63:
+            raise ValueError("KeywordMatcher supports at most 63 distinct terms")
+        self.term_bits = [(term, 1 << bit) for bit, term in enumerate(self.terms)]
+        self.term_patterns = [(re.compile(re.escape(term)), 1 << bit)
+                              for bit, term in enumerate(self.terms)]
+
+        self.slot_masks = []
+        for label, terms in self.slots:
+            mask = 0
+            for term in terms:
+                mask |= 1 << self.terms.index(term)
+            self.slot_masks.append((label, mask))
+
+        self._labels = {}
+
+    def labels_for_mask(self, mask):
+        """Return the comma-joined labels for a bitmask of matched terms."""
+        labels = self._labels.get(mask)
+        if labels is None:
+            found = [label for label, slot_mask in self.slot_masks if mask & slot_mask]
+            labels = ','.join(found) if found else 'other'
+            self._labels[mask] = labels
+        return labels
+
+    def match(self, description):
+        """
+        Find the keywords in a single description.
+
+        Args:
+            description: Transaction description
+
+        Returns:
+            Comma-joined labels, 'other' if none match, or '' for non-string input
+        """
+        if not isinstance(description, str):
+            return ''
+
+        text = description.lower()
+        mask = 0
+        for term, bit in self.term_bits:
+            if term in text:
+                mask |= bit
+        return self.labels_for_mask(mask)
+
+    def match_masks(self, descriptions):
+        """
+        Compute the matched-term bitmask of every description in a list.
+
+        The descriptions are joined into one lowercase buffer and each term is
+        scanned for once over the whole buffer; match offsets are mapped back
+        to rows with a binary search.
+
+        Args:
+            descriptions: List of description strings
+
+        Returns:
+            NumPy int64 array of bitmasks, one per description
+        """
+        masks = np.zeros(len(descriptions), dtype=np.int64)
+        if not descriptions:
+            return masks
+
+        # Lowercase before joining: lowercasing can change the length of some characters
+        lowered = [description.lower() for description in descriptions]
+        text = self.SEPARATOR.join(lowered)
+        lengths = np.fromiter((len(d) + 1 for d in lowered), dtype=np.int64, count=len(lowered))
+        starts = np.cumsum(lengths) - lengths
+
+        for pattern, bit in self.term_patterns:
+            offsets = [match.start() for match in pattern.finditer(text)]
+            if offsets:
+                rows = np.searchsorted(starts, offsets, side='right') - 1
+                masks[rows] |= bit
+        return masks
+
+    def match_series(self, descriptions):
+        """
+        Find the keywords for every description in a Series.
+
+        Args:
+            descriptions: pandas Series of transaction descriptions
+
+        Returns:
+            pandas Series of comma-joined labels aligned with descriptions
+        """
+        values = descriptions.astype(object).to_numpy()
+        is_text = np.fromiter((isinstance(value, str) for value in values), dtype=bool,
+                              count=len(values))
+
+        result = np.full(len(values), '', dtype=object)
+        if is_text.any():
+            masks = self.match_masks(values[is_text].tolist())
+            unique_masks, inverse = np.unique(masks, return_inverse=True)
+            labels = np.array([self.labels_for_mask(int(mask)) for mask in unique_masks],
+                              dtype=object)
+            result[is_text] = labels[inverse]
+        return pd.Series(result, index=descriptions.index, dtype=object)
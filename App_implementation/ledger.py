@@ -0,0 +1,119 @@
+import os
+import threading
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from fingerprint_index import FingerprintIndex
+from shared_instances import SharedInstances
+from statement_normalizer import FINGERPRINT_COLUMN, fingerprints
+from table_cache import read_frame, write_frame
+
+# Column recording the statement each row was first seen in
+SOURCE_COLUMN = 'Statement'
+
+# Per-user SQLite file holding the fingerprints of every stored row
+INDEX_FILE = 'fingerprints.db'
+
+# Segments are always written as pickles, whether or not pyarrow is installed:
+# the ledger is the only copy of a user's history, unlike the table cache
+SEGMENT_EXTENSION = '.pkl'
+
+# Every segment format ever written; earlier versions wrote Parquet when pyarrow was installed
+SEGMENT_EXTENSIONS = ('.pkl', '.parquet')
+
+# Ledgers kept open in the process; each holds an SQLite connection and the loaded history
+MAX_OPEN_LEDGERS = 32
+
+
+class Ledger:
+    """
+    A user's persistent transaction history, built from every statement they upload.
+
+    The ledger is append-only: each merge writes the rows not seen before as
+    a new segment file and never rewrites older ones. Row fingerprints are
+    kept in a per-user SQLite index, so a merge costs one index probe per
+    new row, not time proportional to the history.
+    """
+
+    def __init__(self, username, ledger_dir='ledgers'):
+        """
+        Open a user's ledger.
+
+        Args:
+            username: Owner of the ledger
+            ledger_dir: Directory holding every user's ledger
+        """
+        self.directory = os.path.join(ledger_dir, username)
+        os.makedirs(self.directory, exist_ok=True)
+        self.index = FingerprintIndex(os.path.join(self.directory, INDEX_FILE))
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def _segment_paths(self):
+        """Return the segment files in the order they were written, whatever their format."""
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if name.endswith(SEGMENT_EXTENSIONS))
+
+    def append(self, df, source=None):
+        """
+        Merge a normalized statement into the ledger.
+
+        Args:
+            df: Normalized statement DataFrame
+            source: Name of the statement file, recorded with its rows
+
+        Returns:
+            (number of rows added, number of duplicate rows skipped)
+        """
+        if FINGERPRINT_COLUMN not in df.columns:
+            df = df.assign(**{FINGERPRINT_COLUMN: fingerprints(df)})
+        statement = os.path.basename(source) if source else None
+
+        def write_segment(is_new):
+            # Runs inside the index transaction: rows are only indexed once stored
+            new_rows = df[np.asarray(is_new, dtype=bool)]
+            if len(new_rows):
+                new_rows = new_rows.assign(**{SOURCE_COLUMN: statement}).reset_index(drop=True)
+                name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+                write_frame(new_rows, os.path.join(self.directory, name + SEGMENT_EXTENSION))
+
+        with self._lock:
+            is_new = self.index.insert_new(df[FINGERPRINT_COLUMN].tolist(), statement,
+                                           before_commit=write_segment)
+            added = sum(is_new)
+            if added:
+                self._frame = None
+        if len(is_new) > added:
+            print(f"Skipped {len(is_new) - added} duplicate transactions from {statement}")
+        return added, len(is_new) - added
+
+    def load(self):
+        """Return every transaction in the ledger, oldest segment first."""
+        with self._lock:
+            if self._frame is None:
+                segments = [read_frame(path) for path in self._segment_paths()]
+                if segments:
+                    self._frame = pd.concat(segments, ignore_index=True)
+                else:
+                    self._frame = pd.DataFrame()
+            return self._frame
+
+    def __len__(self):
+        return len(self.index)
+
+
+_ledgers = SharedInstances(MAX_OPEN_LEDGERS)
+
+
+def get_ledger(username, ledger_dir='ledgers'):
+    """
+    Return the process-wide Ledger of a user.
+
+    Only the most recently used ledgers are kept open; the others are opened
+    again on their next use.
+    """
+    return _ledgers.get(lambda: Ledger(username, ledger_dir),
+                        os.path.abspath(os.path.join(ledger_dir, username)))
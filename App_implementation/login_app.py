@@ -1,10 +1,24 @@
 import streamlit as st
-import hashlib
 import os
-import json
+import sys
 from datetime import datetime
-import uuid
-import pdfplumber
+
+# Modules shared with Website_Deploy live in the repository's shared directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+from table_cache import get_cache
+from statement_normalizer import FINGERPRINT_COLUMN
+from ledger import get_ledger
+from ingestion_jobs import DONE, FAILED, QUEUED, RUNNING, extract_statement, get_queue
+from pdf_extraction import PdfPasswordError, preflight
+from working_copies import get_working_copies
+from upload_writer import save_upload
+from credential_store import get_credential_store
+from password_hashing import HashingBusyError, get_hasher
+from login_rate_limiter import LoginRateLimited, get_login_limiter
+from file_metadata import get_file_metadata_store
 import pandas as pd
 from io import BytesIO
 import matplotlib.pyplot as plt
@@ -24,24 +38,44 @@ else:
     print("Gemini API key not found in .env file. Financial advice features will be limited.")
     # We'll handle this in the financial_advice_page method
 
+# Seconds between refreshes of the upload list while an upload is being processed
+JOB_POLL_INTERVAL = 1
+
+# Seconds between looks at a login's password checks while they run
+LOGIN_POLL_INTERVAL = 0.25
+
+# Number of recent uploads listed on the upload page
+RECENT_JOBS = 5
+
 class MobileAuthApp:
     def __init__(self):
         # Initialize session state variables
         if 'page' not in st.session_state:
             st.session_state.page = 'login'
         
-        # User credentials file
+        # User credentials file, migrated into the indexed credential store on first start
         self.credentials_file = 'user_credentials.txt'
+        self.credential_store = get_credential_store('credentials.db', self.credentials_file)
+        self.password_hasher = get_hasher()
+        self.login_limiter = get_login_limiter()
         
         # PDF upload directory
         self.upload_dir = 'uploaded_pdfs'
         os.makedirs(self.upload_dir, exist_ok=True)
         
-        # PDF metadata file
+        # PDF metadata file, migrated into the indexed metadata store on first start
         self.pdf_metadata_file = 'pdf_metadata.json'
-        if not os.path.exists(self.pdf_metadata_file):
-            with open(self.pdf_metadata_file, 'w') as f:
-                json.dump({}, f)
+        self.file_metadata = get_file_metadata_store('pdf_metadata.db', self.pdf_metadata_file)
+        self.files_per_page = 10
+        
+        # Tables already extracted from PDFs, keyed by content hash
+        self.table_cache = get_cache('table_cache')
+        
+        # Decrypted copies of password-protected statements, reused across extractions
+        self.working_copies = get_working_copies()
+        
+        # Uploaded statements are ingested in the background, not in the script run
+        self.ingestion_queue = get_queue()
         
         # Custom CSS for dark-themed mobile-like design
         self.apply_custom_css()
@@ -134,59 +168,83 @@ class MobileAuthApp:
     
     def hash_credentials(self, username, password):
         """
-        Convert username and password to SHA-256 hash
+        Hash username and password with the password hashing service
         """
         # Combine username and password before hashing
         combined = f"{username}:{password}"
-        return hashlib.sha256(combined.encode()).hexdigest()
+        return self.password_hasher.hash(combined)
     
     def save_credentials(self, name, client_id, username, password):
         """
-        Save user credentials to a text file
+        Save user credentials to the credential store
         """
-        hashed_credentials = self.hash_credentials(username, password)
-        
-        # Check if credentials already exist
-        if self.check_credentials_exist(hashed_credentials):
+        # Skip the hashing work when the username is taken
+        if self.credential_store.username_exists(username):
             return False
+        hashed_credentials = self.hash_credentials(username, password)
         
-        # Append new credentials to file
-        with open(self.credentials_file, 'a') as f:
-            # Format: hashed_credentials,name,client_id,username
-            f.write(f"{hashed_credentials},{name},{client_id},{username}\n")
-        
-        return True
+        # Fails if the username or the credentials are already taken
+        return self.credential_store.add(hashed_credentials, name, client_id, username)
     
-    def check_credentials_exist(self, hashed_credentials):
+    def client_address(self):
         """
-        Check if hashed credentials already exist in the file
+        Return the address of the client this script run serves, or None if unknown
         """
-        if not os.path.exists(self.credentials_file):
-            return False
-        
-        with open(self.credentials_file, 'r') as f:
-            for line in f:
-                if line.startswith(hashed_credentials):
-                    return True
-        
-        return False
+        # st.context.ip_address needs Streamlit 1.45 or newer
+        return getattr(getattr(st, 'context', None), 'ip_address', None)
     
-    def validate_login(self, username, password):
+    def start_login(self, username, password):
         """
-        Validate user login credentials
+        Start checking user login credentials on the hashing pool, keeping the checks in session state
         """
-        hashed_credentials = self.hash_credentials(username, password)
+        # Rejects excess attempts before any lookup or hashing; raises LoginRateLimited
+        self.login_limiter.acquire(username, self.client_address())
         
-        if not os.path.exists(self.credentials_file):
-            return False
+        combined = f"{username}:{password}"
         
-        with open(self.credentials_file, 'r') as f:
-            for line in f:
-                if line.startswith(hashed_credentials):
-                    return True
+        # Found through the username index; old files may hold several per username.
+        # Unknown usernames are checked against a dummy hash, taking as long as known ones
+        stored_hashes = self.credential_store.hashes_for(username) or [None]
+        st.session_state['pending_login'] = {
+            'username': username,
+            'checks': [(stored_hash, self.password_hasher.check_async(combined, stored_hash))
+                       for stored_hash in stored_hashes],
+        }
+    
+    def finish_login(self, pending):
+        """
+        Return True if any of the finished checks of a login matched
+        """
+        for stored_hash, future in pending['checks']:
+            matches, new_hash = future.result()
+            if matches:
+                # Hashes made with older parameters or schemes are replaced on login
+                if new_hash:
+                    self.credential_store.replace_hash(stored_hash, new_hash)
+                self.login_limiter.record_success(pending['username'])
+                return True
         
         return False
     
+    @st.fragment(run_every=LOGIN_POLL_INTERVAL)
+    def pending_login_section(self):
+        """Rerun only this section until the login's checks finish, then rerun the page with the outcome"""
+        pending = st.session_state.get('pending_login')
+        if pending is None:
+            return
+        if not all(future.done() for _, future in pending['checks']):
+            st.info("Signing in...")
+            return
+        
+        del st.session_state['pending_login']
+        if self.finish_login(pending):
+            # Set session state for login
+            st.session_state['current_username'] = pending['username']
+            st.session_state['page'] = 'file_upload'
+        else:
+            st.session_state['login_error'] = "Invalid username or password"
+        st.rerun()
+    
     def login_page(self):
         """Render login page"""
         st.markdown('<div class="login-container">', unsafe_allow_html=True)
@@ -209,17 +267,24 @@ class MobileAuthApp:
         
         if login_btn:
             if username and password:
-                if self.validate_login(username, password):
-                    # Set session state for login
-                    st.session_state['current_username'] = username
-                    st.session_state['page'] = 'file_upload'
-                    # Use st.rerun() instead of st.experimental_rerun()
-                    st.rerun()
-                else:
-                    st.error("Invalid username or password")
+                try:
+                    # Checked on the hashing pool; pending_login_section picks up the outcome
+                    self.start_login(username, password)
+                except LoginRateLimited as e:
+                    st.error(f"Too many login attempts. Please try again in {e.retry_after:.0f} seconds.")
+                except HashingBusyError:
+                    st.error("Too many sign-ins right now. Please try again in a moment.")
             else:
                 st.error("Please fill in all fields")
         
+        # Outcome of a login whose checks finished before this rerun
+        login_error = st.session_state.pop('login_error', None)
+        if login_error:
+            st.error(login_error)
+        
+        if 'pending_login' in st.session_state:
+            self.pending_login_section()
+        
         if signup_btn:
             st.session_state['page'] = 'signup'
             st.rerun()
@@ -260,13 +325,16 @@ class MobileAuthApp:
         if signup_btn:
             if name and client_id and username and password:
                 # Attempt to save credentials
-                if self.save_credentials(name, client_id, username, password):
-                    st.success("Account Created Successfully!")
-                    # Redirect to login page
-                    st.session_state['page'] = 'login'
-                    st.rerun()
-                else:
-                    st.error("Username already exists. Please choose another.")
+                try:
+                    if self.save_credentials(name, client_id, username, password):
+                        st.success("Account Created Successfully!")
+                        # Redirect to login page
+                        st.session_state['page'] = 'login'
+                        st.rerun()
+                    else:
+                        st.error("Username already exists. Please choose another.")
+                except HashingBusyError:
+                    st.error("Too many sign-ups right now. Please try again in a moment.")
             else:
                 st.error("Please fill in all fields")
         
@@ -282,68 +350,50 @@ class MobileAuthApp:
         os.makedirs(user_dir, exist_ok=True)
         return user_dir
     
-    def extract_table_pdfplumber(self, pdf_path, password=None):
-        """Extract tables from PDF using pdfplumber"""
-        all_data = []
-        column_names = None
-        
+    def extract_table_pdfplumber(self, pdf_path, password=None, cache_key=None):
+        """Extract tables from PDF, reusing the cached table for identical PDFs"""
         try:
-            # Open PDF with password if provided
-            with pdfplumber.open(pdf_path, password=password) as pdf:
-                # Process each page
-                for page_num, page in enumerate(pdf.pages, 1):
-                    extracted_table = page.extract_table()
-                    
-                    if extracted_table:
-                        # For the first table with data, get column names
-                        if column_names is None and len(extracted_table) > 0:
-                            column_names = extracted_table[0]
-                            # Add data rows from first table (skip header row)
-                            all_data.extend(extracted_table[1:])
-                        else:
-                            # Check if subsequent tables have the same column structure
-                            if len(extracted_table) > 0:
-                                if extracted_table[0] == column_names:
-                                    # Same structure, skip header
-                                    all_data.extend(extracted_table[1:])
-                                else:
-                                    # Different header structure, try to map columns or add as is
-                                    all_data.extend(extracted_table)
-                                    
-                        st.write(f"Processed page {page_num}: Found {len(extracted_table)} rows")
-
-            # Create DataFrame from collected data
-            if all_data and column_names:
-                # Create DataFrame with consistent column names
-                all_data = [row[:5] + row[6:] if len(row) > 5 else row for row in all_data]
-                df = pd.DataFrame(all_data, columns=column_names)
-                
-                # Clean data - convert numeric columns
-                for col in df.columns:
-                    # Try to convert to numeric if possible
-                    try:
-                        df[col] = pd.to_numeric(df[col])
-                    except:
-                        pass  # Keep as is if conversion fails
-                
-                # Drop NaN rows that don't contain essential information
-                if 'Particulars' in df.columns:
-                    df = df.dropna(subset=['Particulars'])
-                if 'Balance' in df.columns:
-                    df = df.dropna(subset(['Balance']))
-                
-                # Store only the DataFrame directly in session state
-                st.session_state['extracted_df'] = df
-                st.session_state['current_pdf'] = pdf_path
-                
-                # Generate basic transaction summary
-                result = self.generate_transaction_summary(df)
-                st.session_state['transaction_summary'] = result
-                
-                return df
-            else:
+            if cache_key is None:
+                cache_key = self.table_cache.key_for_file(pdf_path, password)
+        except Exception as e:
+            st.error(f"Error reading PDF: {e}")
+            return None
+        
+        df = self.table_cache.get(cache_key)
+        if df is not None:
+            st.write(f"Loaded {len(df)} previously extracted rows")
+        else:
+            try:
+                # Checks the password before any page is parsed
+                username = st.session_state.get('current_username', 'Unknown User')
+                source, source_password = self.working_copies.get(
+                    username, pdf_path, cache_key, password)
+            except (PdfPasswordError, PermissionError) as e:
+                st.error(str(e))
                 return None
-                
+            df = self.parse_pdf_tables(source, source_password)
+            if df is None:
+                return None
+            self.table_cache.put(cache_key, df)
+        
+        # Store only the DataFrame directly in session state
+        st.session_state['extracted_df'] = df
+        st.session_state['current_pdf'] = pdf_path
+        
+        # Generate basic transaction summary
+        result = self.generate_transaction_summary(df)
+        st.session_state['transaction_summary'] = result
+        
+        return df
+    
+    def parse_pdf_tables(self, pdf_path, password=None):
+        """Parse the tables of a PDF into a DataFrame using pdfplumber"""
+        def progress(page_num, n_pages, rows):
+            if rows:
+                st.write(f"Processed page {page_num}: Found {rows} rows")
+        
+        try:
+            return extract_statement(pdf_path, password, progress)
         except Exception as e:
             st.error(f"Error extracting tables: {e}")
             return None
@@ -351,21 +401,14 @@ class MobileAuthApp:
     def generate_transaction_summary(self, df):
         """Generate a summary of transactions"""
         try:
-            # Create a copy of the DataFrame to avoid modifying the original
-            summary_df = df.copy()
-            
             # Handle withdrawals and deposits if they exist
-            if 'Withdrawl' in summary_df.columns and 'Deposit' in summary_df.columns:
-                # Convert to numeric if they aren't already
-                summary_df['Withdrawl'] = pd.to_numeric(summary_df['Withdrawl'], errors='coerce').fillna(0)
-                summary_df['Deposit'] = pd.to_numeric(summary_df['Deposit'], errors='coerce').fillna(0)
-                
+            if 'Withdrawl' in df.columns and 'Deposit' in df.columns:
                 # Generate summary text
                 summary_text = "Transaction Summary:\n\n"
                 
-                # Calculate totals
-                total_expense = summary_df['Withdrawl'].sum()
-                total_income = summary_df['Deposit'].sum()
+                # Calculate totals; amounts are already float64 and missing ones are skipped
+                total_expense = df['Withdrawl'].sum()
+                total_income = df['Deposit'].sum()
                 net_flow = total_income - total_expense
                 
                 summary_text += f"Total Expense: ₹{total_expense:.2f}"
@@ -381,28 +424,17 @@ class MobileAuthApp:
         except Exception as e:
             return f"Error generating summary: {str(e)}"
     
-    def save_pdf_metadata(self, username, filename, original_filename):
+    def save_pdf_metadata(self, username, filename, original_filename, file_size=None, cache_key=None):
         """Save metadata about uploaded PDF files"""
         try:
-            # Read existing metadata
-            with open(self.pdf_metadata_file, 'r') as f:
-                metadata = json.load(f)
-            
-            # Add new file metadata
-            file_id = str(uuid.uuid4())
-            metadata[file_id] = {
-                'username': username,
-                'filename': filename,
-                'original_filename': original_filename,
-                'upload_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'file_size': os.path.getsize(filename)
-            }
-            
-            # Write updated metadata
-            with open(self.pdf_metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=4)
-                
-            return file_id
+            # A single-row insert, safe with concurrent uploads
+            return self.file_metadata.add(
+                username,
+                filename,
+                original_filename,
+                file_size if file_size is not None else os.path.getsize(filename),
+                cache_key,
+            )
         except Exception as e:
             st.error(f"Error saving file metadata: {str(e)}")
             return None
@@ -454,6 +486,17 @@ class MobileAuthApp:
                     st.error("Only PDF files are allowed!")
                     return
                 
+                # A view of the uploaded bytes, so the upload is not copied
+                data = uploaded_file.getbuffer()
+                
+                # Check the password and page count before saving anything
+                password = pdf_password if pdf_password else None
+                try:
+                    n_pages, _ = preflight(data, password)
+                except PdfPasswordError as e:
+                    st.error(str(e))
+                    return
+                
                 # Get user-specific directory
                 user_dir = self.get_user_upload_dir(current_username)
                 
@@ -465,9 +508,11 @@ class MobileAuthApp:
                     f"{timestamp}_{safe_filename}"
                 )
                 
-                # Save the uploaded file
-                with open(unique_filename, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                # Save the uploaded file in the background; extraction reads the bytes in memory
+                save_upload(data, unique_filename)
+                
+                # Hash the bytes already in memory; a repeat upload hits the table cache
+                cache_key = self.table_cache.key_for_bytes(data, password)
                 
                 # Save metadata including any tags
                 tags = [tag.strip() for tag in file_tags.split(',')] if file_tags else []
@@ -475,26 +520,23 @@ class MobileAuthApp:
                     current_username,
                     unique_filename,
                     uploaded_file.name,
+                    len(data),
+                    cache_key,
                 )
                 
                 if file_id:
                     st.success(f"PDF '{uploaded_file.name}' uploaded successfully!")
-                    st.info(f"File ID: {file_id}")
+                    st.info(f"File ID: {file_id} ({n_pages} pages)")
                     
-                    # Process the PDF to extract tables
-                    with st.spinner("Extracting data from PDF..."):
-                        password = pdf_password if pdf_password else None
-                        df = self.extract_table_pdfplumber(unique_filename, password)
-                        
-                        if df is not None:
-                            # Store the DataFrame in session state
-                            st.session_state['extracted_df'] = df
-                            st.session_state['current_pdf'] = unique_filename
-                            st.session_state['page'] = 'view_dataframe'
-                            st.success("Data extracted successfully! View the data table.")
-                            st.rerun()
-                        else:
-                            st.warning("No tables found in the PDF or extraction failed.")
+                    # Extract and merge into the user's history in the background
+                    self.ingestion_queue.submit(
+                        current_username,
+                        unique_filename,
+                        uploaded_file.name,
+                        password,
+                        cache_key,
+                        data,
+                    )
                 else:
                     st.warning("File uploaded but metadata could not be saved.")
             except Exception as e:
@@ -511,8 +553,53 @@ class MobileAuthApp:
             st.session_state['page'] = 'login'
             st.rerun()
         
+        self.ingestion_jobs_section(current_username)
+        
         st.markdown('</div>', unsafe_allow_html=True)
     
+    def ingestion_jobs_section(self, username):
+        """Show the user's recent uploads, refreshing them while any is still being processed"""
+        jobs = self.ingestion_queue.store.list_for_user(username, limit=RECENT_JOBS)
+        if any(job['status'] in (QUEUED, RUNNING) for job in jobs):
+            self.polled_jobs_section(username)
+        else:
+            self.show_ingestion_jobs(username, jobs)
+    
+    @st.fragment(run_every=JOB_POLL_INTERVAL)
+    def polled_jobs_section(self, username):
+        """Rerun only the upload list every JOB_POLL_INTERVAL seconds, not the whole page"""
+        jobs = self.ingestion_queue.store.list_for_user(username, limit=RECENT_JOBS)
+        if not self.show_ingestion_jobs(username, jobs):
+            # Every upload is processed: rerun the page once to stop polling
+            st.rerun()
+    
+    def show_ingestion_jobs(self, username, jobs):
+        """Show the given uploads and their processing status; return True while any is still active"""
+        if not jobs:
+            return False
+        
+        st.markdown('<h3 style="color:var(--accent-primary);">Recent Uploads</h3>', unsafe_allow_html=True)
+        active = False
+        for job in jobs:
+            st.write(f"{job['original_filename']} ({job['created_at']})")
+            if job['status'] in (QUEUED, RUNNING):
+                active = True
+                st.progress(job['progress'], text=job['message'] or "Waiting to be processed")
+            elif job['status'] == DONE:
+                st.success(job['message'])
+                if st.button("View Data", key=f"job_{job['job_id']}"):
+                    # Show the user's whole history, including this statement
+                    history = get_ledger(username).load()
+                    st.session_state['merge_report'] = f"{job['message']} Showing all {len(history)} transactions."
+                    st.session_state['extracted_df'] = history
+                    st.session_state['transaction_summary'] = self.generate_transaction_summary(history)
+                    st.session_state['current_pdf'] = job['pdf_path']
+                    st.session_state['page'] = 'view_dataframe'
+                    st.rerun()
+            elif job['status'] == FAILED:
+                st.warning(job['message'])
+        return active
+    
     def view_dataframe_page(self):
         """Display the extracted DataFrame from PDF"""
         st.markdown('<div class="login-container">', unsafe_allow_html=True)
@@ -527,6 +614,11 @@ class MobileAuthApp:
             # Show PDF file name
             st.write(f"Data from: {os.path.basename(current_pdf)}")
             
+            # Result of merging the last upload into the user's history
+            merge_report = st.session_state.pop('merge_report', None)
+            if merge_report:
+                st.info(merge_report)
+            
             # Display DataFrame statistics
             st.write(f"Found {len(df)} rows and {len(df.columns)} columns")
             
@@ -537,10 +629,13 @@ class MobileAuthApp:
                 # Add search/filter capability
                 search_term = st.text_input("Search in data", "")
                 
+                # Fingerprints are for duplicate detection, not for display
+                display_df = df.drop(columns=[FINGERPRINT_COLUMN], errors='ignore')
+                
                 # Filter DataFrame if search term is provided
-                filtered_df = df
+                filtered_df = display_df
                 if search_term:
-                    filtered_df = df[df.astype(str).apply(
+                    filtered_df = display_df[display_df.astype(str).apply(
                         lambda row: row.str.contains(search_term, case=False).any(), axis=1)]
                     st.write(f"Found {len(filtered_df)} matching rows")
                 
@@ -583,8 +678,6 @@ class MobileAuthApp:
                 if 'Withdrawl' in df.columns and 'Date' in df.columns:
                     try:
                         st.subheader("Transaction Trends")
-                        # Convert date column to datetime if it's not already
-                        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
                         # Group by date and sum withdrawals and deposits
                         date_summary = df.groupby(df['Date'].dt.date).agg({
                             'Withdrawl': 'sum',
@@ -680,6 +773,7 @@ class MobileAuthApp:
                 summary_text += transaction_summary + "\n\n"
             
             # Add column information
+            df = df.drop(columns=[FINGERPRINT_COLUMN], errors='ignore')
             summary_text += f"Data columns: {', '.join(df.columns.tolist())}\n\n"
             
             # Add sample data (first 5 rows)
@@ -781,20 +875,25 @@ class MobileAuthApp:
         current_username = st.session_state.get('current_username', 'Unknown User')
         
         try:
-            # Load metadata
-            with open(self.pdf_metadata_file, 'r') as f:
-                metadata = json.load(f)
+            total_files = self.file_metadata.count_for_user(current_username)
             
-            # Filter for current user's files
-            user_files = {k: v for k, v in metadata.items() if v['username'] == current_username}
-            
-            if not user_files:
+            if not total_files:
                 st.info("You haven't uploaded any files yet.")
             else:
-                st.write(f"You have {len(user_files)} file(s) uploaded:")
+                st.write(f"You have {total_files} file(s) uploaded:")
+                
+                # Only the current page of files is loaded, newest first
+                n_pages = -(-total_files // self.files_per_page)
+                page = min(st.session_state.get('files_page', 0), n_pages - 1)
+                user_files = self.file_metadata.list_for_user(
+                    current_username,
+                    self.files_per_page,
+                    page * self.files_per_page,
+                )
                 
                 # Display files in a nice format
-                for file_id, file_data in user_files.items():
+                for file_data in user_files:
+                    file_id = file_data['file_id']
                     with st.expander(f"{file_data['original_filename']} ({file_data['upload_date']})"):
                         st.write(f"Upload date: {file_data['upload_date']}")
                         st.write(f"File size: {file_data['file_size']/1024:.2f} KB")
@@ -808,6 +907,35 @@ class MobileAuthApp:
                                     file_name=file_data['original_filename'],
                                     mime="application/pdf"
                                 )
+                            
+                            # Re-open the extracted data; the key recorded at upload finds the
+                            # cached table without the PDF password
+                            if st.button("View Data", key=f"view_{file_id}"):
+                                df = self.extract_table_pdfplumber(
+                                    file_data['filename'],
+                                    cache_key=file_data.get('cache_key'),
+                                )
+                                if df is not None:
+                                    st.session_state['page'] = 'view_dataframe'
+                                    st.rerun()
+                                else:
+                                    st.warning("No tables found in the PDF or extraction failed.")
+                
+                if n_pages > 1:
+                    prev_col, page_col, next_col = st.columns(3)
+                    
+                    with prev_col:
+                        if st.button("Previous", disabled=page == 0):
+                            st.session_state['files_page'] = page - 1
+                            st.rerun()
+                    
+                    with page_col:
+                        st.write(f"Page {page + 1} of {n_pages}")
+                    
+                    with next_col:
+                        if st.button("Next", disabled=page >= n_pages - 1):
+                            st.session_state['files_page'] = page + 1
+                            st.rerun()
         except Exception as e:
             st.error(f"Error loading your files: {str(e)}")
         
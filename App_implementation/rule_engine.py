@@ -0,0 +1,177 @@
+import json
+import operator
+import threading
+import numpy as np
+import pandas as pd
+
+
+def load_rules(path):
+    """
+    Load a rule table from a JSON file.
+
+    Args:
+        path: Path to a JSON file containing a list of rules
+
+    Returns:
+        List of rule dictionaries
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class RuleEngine:
+    """
+    Evaluates an ordered table of categorization rules, first match wins.
+
+    Each rule is a dictionary with a 'name', the 'category' it assigns and
+    either an 'all' (AND) or an 'any' (OR) list of [field, op, value]
+    conditions over the extracted features. 'AbsAmount' can be used as a field
+    for the absolute TransactionAmount.
+
+    The table is compiled once; it can then be applied to a single feature
+    dictionary or to a whole features DataFrame with column masks. The engine
+    counts how many transactions each rule categorized.
+    """
+
+    OPERATORS = {
+        '==': operator.eq,
+        '!=': operator.ne,
+        '<': operator.lt,
+        '<=': operator.le,
+        '>': operator.gt,
+        '>=': operator.ge,
+    }
+
+    def __init__(self, rules):
+        """
+        Compile the rule table.
+
+        Args:
+            rules: List of rule dictionaries, in priority order
+        """
+        self.rules = []
+        for position, rule in enumerate(rules):
+            if 'category' not in rule:
+                raise ValueError(f"Rule {position} has no category")
+            if ('all' in rule) == ('any' in rule):
+                raise ValueError(f"Rule {position} needs exactly one of 'all' or 'any'")
+
+            match_all = 'all' in rule
+            if not rule['all' if match_all else 'any']:
+                raise ValueError(f"Rule {position} has no conditions")
+            conditions = []
+            for field, op, value in rule['all' if match_all else 'any']:
+                if op != 'contains' and op not in self.OPERATORS:
+                    raise ValueError(f"Rule {position} uses unknown operator {op!r}")
+                conditions.append((field, op, value))
+
+            name = rule.get('name', f"rule_{position}")
+            self.rules.append((name, rule['category'], match_all, conditions))
+
+        self.categories = np.array([category for _, category, _, _ in self.rules] + [None],
+                                   dtype=object)
+        self._hits = [0] * len(self.rules)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _value(features, field):
+        """Return a field of a feature dictionary."""
+        if field == 'AbsAmount':
+            return abs(features['TransactionAmount'])
+        return features[field]
+
+    def _test(self, features, condition):
+        """Test one condition against a feature dictionary."""
+        field, op, value = condition
+        actual = self._value(features, field)
+        if op == 'contains':
+            return isinstance(actual, str) and value in actual
+        return self.OPERATORS[op](actual, value)
+
+    def evaluate_one(self, features):
+        """
+        Return the category of the first rule a transaction matches.
+
+        Args:
+            features: Dictionary of extracted features
+
+        Returns:
+            Category string, or None if no rule matches
+        """
+        for position, (_, category, match_all, conditions) in enumerate(self.rules):
+            if match_all:
+                matched = all(self._test(features, condition) for condition in conditions)
+            else:
+                matched = any(self._test(features, condition) for condition in conditions)
+            if matched:
+                with self._lock:
+                    self._hits[position] += 1
+                return category
+        return None
+
+    def _column(self, features, field, columns):
+        """Return a field of a features DataFrame as a NumPy array, cached per call."""
+        if field not in columns:
+            if field == 'AbsAmount':
+                columns[field] = np.abs(features['TransactionAmount'].to_numpy(dtype=float))
+            else:
+                columns[field] = features[field].to_numpy()
+        return columns[field]
+
+    def _mask(self, features, condition, columns):
+        """Compute the boolean mask of one condition over a features DataFrame."""
+        field, op, value = condition
+        if op != 'contains':
+            return np.asarray(self.OPERATORS[op](self._column(features, field, columns), value),
+                              dtype=bool)
+
+        # Substring tests run once per distinct value, not once per row
+        key = ('factorized', field)
+        if key not in columns:
+            columns[key] = pd.factorize(features[field])
+        codes, uniques = columns[key]
+        unique_mask = np.array([isinstance(unique, str) and value in unique for unique in uniques]
+                               + [False], dtype=bool)
+        return unique_mask[codes]
+
+    def evaluate(self, features):
+        """
+        Return the category of the first rule each transaction matches.
+
+        Args:
+            features: DataFrame of extracted features
+
+        Returns:
+            NumPy object array of categories, None where no rule matches
+        """
+        columns = {}
+        masks = []
+        for _, _, match_all, conditions in self.rules:
+            combine = np.logical_and if match_all else np.logical_or
+            mask = self._mask(features, conditions[0], columns)
+            for condition in conditions[1:]:
+                mask = combine(mask, self._mask(features, condition, columns))
+            masks.append(mask)
+
+        # Index of the first matching rule per row; len(rules) means no match
+        if masks:
+            matched = np.select(masks, np.arange(len(self.rules)), default=len(self.rules))
+        else:
+            matched = np.zeros(len(features), dtype=int)
+
+        hits = np.bincount(matched, minlength=len(self.rules) + 1)
+        with self._lock:
+            for position in range(len(self.rules)):
+                self._hits[position] += int(hits[position])
+
+        return self.categories[matched]
+
+    def hit_counts(self):
+        """Return the number of transactions each rule has categorized, by rule name."""
+        with self._lock:
+            return {name: hits for (name, _, _, _), hits in zip(self.rules, self._hits)}
+
+    def reset_hit_counts(self):
+        """Reset the per-rule hit counters."""
+        with self._lock:
+            self._hits = [0] * len(self.rules)
@@ -0,0 +1,37 @@
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """
+    Base class of the stores kept in a SQLite database file.
+
+    One connection serves every thread of the process and is used under
+    self._lock. The database is put in WAL mode, so reads are not blocked
+    while another connection writes. Rows come back as sqlite3.Row.
+    """
+
+    # CREATE statements run when the store is opened
+    SCHEMA = ()
+
+    def __init__(self, db_path):
+        """
+        Open (and create if needed) the store.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                for statement in self.SCHEMA:
+                    self._conn.execute(statement)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from transaction_categorizer import TransactionCategorizer
+
+# Columns holding money amounts, stored as float64
+AMOUNT_COLUMNS = ['Withdrawl', 'Deposit', 'Balance']
+
+# Column holding the transaction date, stored as datetime64
+DATE_COLUMN = 'Date'
+
+# Column holding the transaction description
+DESCRIPTION_COLUMN = 'Particulars'
+
+# Column added with the transaction type, stored as a category
+TYPE_COLUMN = 'TransactionType'
+TRANSACTION_TYPES = ['UPI', 'CARD_PAYMENT', 'IMPS', 'INTEREST', 'REFUND', 'CMS', 'OTHER']
+
+# Column added with each transaction's fingerprint, a signed 64-bit integer
+FINGERPRINT_COLUMN = 'Fingerprint'
+
+# Columns identifying a transaction, whichever statement it came from
+FINGERPRINT_COLUMNS = ['Date', 'Particulars', 'Chq./Ref.No.', 'Withdrawl', 'Deposit']
+
+# Currency symbols and codes, thousands separators and spaces inside amounts
+AMOUNT_NOISE = r'[₹$€£,\s]|Rs\.?|INR'
+
+# Used only for its date parsing and transaction type rules; no model is loaded
+_categorizer = None
+
+
+def _get_categorizer():
+    global _categorizer
+    if _categorizer is None:
+        _categorizer = TransactionCategorizer()
+    return _categorizer
+
+
+def clean_text(values):
+    """Join multiline cells into one line and trim them; empty cells become NaN."""
+    text = values.astype(object).where(values.map(lambda value: isinstance(value, str)))
+    text = text.str.replace(r'\s+', ' ', regex=True).str.strip()
+    return text.where(text != '')
+
+
+def parse_amounts(values):
+    """Parse an amount column to float64, stripping currency symbols and separators."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('float64')
+    cleaned = values.astype(str).str.replace(AMOUNT_NOISE, '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').astype('float64')
+
+
+def fingerprints(df):
+    """
+    Compute a stable fingerprint for every transaction in a normalized statement.
+
+    The fingerprint hashes Date, Particulars, Chq./Ref.No. and the amounts.
+    Identical rows within one statement are separate transactions, so each
+    also hashes its occurrence number; an overlapping statement uploaded
+    later then gives the same fingerprints for the rows it shares.
+
+    Args:
+        df: Normalized statement DataFrame
+
+    Returns:
+        pandas Series of int64 fingerprints aligned with df
+    """
+    columns = {}
+    for column in FINGERPRINT_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df.iloc[:, list(df.columns).index(column)]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            # Hash the calendar date, not the datetime64 unit it is stored in
+            values = values.dt.strftime('%Y-%m-%d')
+        columns[column] = values
+    keys = pd.util.hash_pandas_object(pd.DataFrame(columns, index=df.index), index=False)
+    occurrence = keys.groupby(keys).cumcount()
+    hashed = pd.util.hash_pandas_object(pd.DataFrame({'key': keys, 'occurrence': occurrence}),
+                                        index=False)
+    # Signed, so the value fits an SQLite INTEGER
+    return pd.Series(hashed.to_numpy().view(np.int64), index=df.index)
+
+
+def normalize_statement(df):
+    """
+    Convert an extracted statement to its typed schema.
+
+    Runs once per statement, right after extraction; the result is what gets
+    cached and kept in the session, so later pages use the columns as they
+    are without coercing them again.
+
+    - text cells: multiline cells joined into one line, whitespace trimmed
+    - Withdrawl, Deposit, Balance: float64, without currency symbols or commas
+    - Date: datetime64, in the format inferred for the whole column
+    - TransactionType: category derived from Particulars
+    - Fingerprint: stable int64 identifying the transaction (see fingerprints)
+
+    Rows without Particulars or Balance are dropped.
+
+    Args:
+        df: DataFrame of extracted cells
+
+    Returns:
+        New DataFrame with the typed columns
+    """
+    df = df.copy()
+    categorizer = _get_categorizer()
+
+    # By position: extracted headers can repeat column names
+    for position, column in enumerate(df.columns):
+        values = df.iloc[:, position]
+        if column in AMOUNT_COLUMNS:
+            df.isetitem(position, parse_amounts(values))
+        elif not pd.api.types.is_numeric_dtype(values):
+            df.isetitem(position, clean_text(values))
+
+    if DATE_COLUMN in df.columns:
+        position = list(df.columns).index(DATE_COLUMN)
+        df.isetitem(position, categorizer.parse_dates(df.iloc[:, position]))
+
+    # Drop rows that don't contain essential information
+    if DESCRIPTION_COLUMN in df.columns:
+        df = df.dropna(subset=[DESCRIPTION_COLUMN])
+        descriptions = df.iloc[:, list(df.columns).index(DESCRIPTION_COLUMN)]
+        df[TYPE_COLUMN] = pd.Categorical(
+            categorizer.extract_transaction_types(descriptions),
+            categories=TRANSACTION_TYPES,
+        )
+    if 'Balance' in df.columns:
+        df = df.dropna(subset=['Balance'])
+
+    df = df.reset_index(drop=True)
+    df[FINGERPRINT_COLUMN] = fingerprints(df)
+    return df
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import threading
+import uuid
+
+import pandas as pd
+
+from shared_instances import SharedInstances
+
+# Bump whenever extraction output changes, so stale cached tables are not reused
+EXTRACTOR_VERSION = '5'
+
+# Parquet needs pyarrow; without it tables are cached as pickles
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+FRAME_EXTENSION = '.parquet' if CACHE_FORMAT == 'parquet' else '.pkl'
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Size of the blocks read when hashing a file
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def read_frame(path):
+    """Read a DataFrame written by write_frame, in the format its extension names."""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def write_frame(df, path):
+    """
+    Write a DataFrame as Parquet if path ends in '.parquet', as a pickle otherwise.
+
+    Readers never see a partially written file.
+    """
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        if path.endswith('.parquet'):
+            df.to_parquet(temp_path, index=False)
+        else:
+            df.to_pickle(temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class TableCache:
+    """
+    An on-disk cache of DataFrames extracted from statement PDFs.
+
+    Entries are keyed by the SHA-256 of the PDF bytes, the password used to
+    open it and EXTRACTOR_VERSION, so the same statement is only parsed once.
+    The directory is kept under max_bytes by evicting the least recently used
+    entries. Hits and misses are counted for this process.
+    """
+
+    def __init__(self, cache_dir='table_cache', max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory the cached tables are stored in
+            max_bytes: Maximum total size of the cached tables
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.extension = FRAME_EXTENSION
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _hasher(password=None):
+        """Return a SHA-256 hasher seeded with the extractor version and password."""
+        hasher = hashlib.sha256()
+        hasher.update(f"{EXTRACTOR_VERSION}\0{password or ''}\0".encode('utf-8'))
+        return hasher
+
+    def key_for_bytes(self, pdf_bytes, password=None):
+        """Return the cache key for PDF contents held in memory."""
+        hasher = self._hasher(password)
+        hasher.update(pdf_bytes)
+        return hasher.hexdigest()
+
+    def key_for_file(self, pdf_path, password=None):
+        """Return the cache key for a PDF file on disk."""
+        hasher = self._hasher(password)
+        with open(pdf_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def get(self, key):
+        """
+        Return the cached table for a key.
+
+        Args:
+            key: Cache key from key_for_bytes or key_for_file
+
+        Returns:
+            DataFrame, or None if the table is not cached
+        """
+        path = self._path(key)
+        try:
+            df = read_frame(path)
+            # Mark the entry as recently used for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            df = None
+        except Exception as e:
+            print(f"Error reading cached table {key}: {e}")
+            df = None
+
+        with self._lock:
+            if df is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return df
+
+    def put(self, key, df):
+        """Store a table, then evict old entries if the cache is over its size limit."""
+        try:
+            write_frame(df, self._path(key))
+        except Exception as e:
+            print(f"Error caching table {key}: {e}")
+            return False
+
+        self.evict()
+        return True
+
+    def _entries(self):
+        """Return (last_used, size, path) for every cached table."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.extension):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Remove the least recently used tables until the cache fits in max_bytes."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def stats(self):
+        """Return a dictionary of cache statistics."""
+        entries = self._entries()
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(entries),
+                'size_bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes,
+            }
+
+
+_caches = SharedInstances()
+
+
+def get_cache(cache_dir='table_cache', max_bytes=DEFAULT_MAX_BYTES):
+    """Return the process-wide TableCache for a directory."""
+    return _caches.get(lambda: TableCache(cache_dir, max_bytes), os.path.abspath(cache_dir))
@@ -1,31 +1,127 @@
 import pandas as pd
 import numpy as np
+import os
 import re
-import pickle
+import sys
+import time
 from datetime import datetime
 
+# Modules shared with Website_Deploy live in the repository's shared directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+from keyword_matcher import KeywordMatcher
+from feature_cache import FeatureCache
+from rule_engine import RuleEngine
+from fast_predictor import FastPredictor
+from model_registry import load_artifact
+
 class TransactionCategorizer:
     """
     A class to categorize bank transactions into different expense categories
     using both rule-based logic and machine learning.
     """
     
-    def __init__(self, model_path=None, preprocessor_path=None):
+    # Merchant groups checked first, as (keyword emitted, merchant names)
+    MERCHANT_GROUPS = [
+        ('amazon', ['amazon']),
+        ('entertainment', ['bookmyshow']),
+        ('shopping', ['meesho', 'flipkart']),
+        ('telecom', ['jio', 'airtel', 'voda']),
+        ('travel', ['railway', 'travel', 'cmrl']),
+        ('payment_app', ['paytm', 'phonepe', 'gpay']),
+    ]
+    
+    # List of common keywords to look for
+    KEYWORDS = ['food', 'grocery', 'restaurant', 'cinema', 'movie', 'travel', 'uber', 'ola',
+                'amazon', 'flipkart', 'payment', 'bill', 'recharge', 'salary', 'rent', 
+                'transfer', 'education', 'health', 'medicine', 'hospital', 'entertainment']
+    
+    # Payee name patterns, tried in order until one matches
+    PAYEE_PATTERNS = [
+        re.compile(r'/([A-Z]{2,}?)/'),  # Capture 2+ uppercase letters between slashes
+        re.compile(r'/([A-Za-z]{2,}?)/'),  # Capture 2+ letters between slashes
+        re.compile(r'([A-Za-z]{3,})@')  # Capture 3+ letters before @
+    ]
+    
+    # Hybrid categorization rules, applied before the ML model; first match wins.
+    # Conditions are [field, op, value]; 'AbsAmount' is abs(TransactionAmount).
+    RULES = [
+        # UPI transactions without payee name and under $200
+        {'name': 'small_upi_no_payee', 'category': 'FOOD',
+         'all': [['TransactionType', '==', 'UPI'], ['HasPayee', '==', 0], ['AbsAmount', '<', 200]]},
+        # UPI transactions with payee name
+        {'name': 'upi_with_payee', 'category': 'FRIENDS_FAMILY',
+         'all': [['TransactionType', '==', 'UPI'], ['HasPayee', '==', 1],
+                 ['TransactionAmount', '<', 0]]},
+        # Transactions over $200
+        {'name': 'large_debit', 'category': 'PURCHASES',
+         'all': [['AbsAmount', '>', 200], ['TransactionAmount', '<', 0]]},
+        {'name': 'interest_or_credit', 'category': 'INCOME',
+         'any': [['TransactionType', '==', 'INTEREST'], ['TransactionAmount', '>', 0]]},
+        # Check keywords for specific categories
+        {'name': 'shopping_keywords', 'category': 'SHOPPING',
+         'any': [['Keywords', 'contains', 'amazon'], ['Keywords', 'contains', 'shopping']]},
+        {'name': 'entertainment_keywords', 'category': 'ENTERTAINMENT',
+         'all': [['Keywords', 'contains', 'entertainment']]},
+        {'name': 'travel_keywords', 'category': 'TRAVEL',
+         'all': [['Keywords', 'contains', 'travel']]},
+        {'name': 'telecom_keywords', 'category': 'UTILITIES',
+         'all': [['Keywords', 'contains', 'telecom']]},
+    ]
+    
+    # Date formats accepted in the Date column, in order of preference
+    DATE_FORMATS = ['%d-%b-%Y', '%Y-%m-%d']
+    
+    # Features used by the ML model
+    MODEL_FEATURES = ['TransactionType', 'HasPayee', 'TransactionAmount', 
+                      'DayOfWeek', 'IsWeekend', 'Month', 'IsRoundAmount',
+                      'is_small_upi_no_payee', 'is_upi_with_payee', 'is_large_amount']
+    
+    # Largest fallback batch sent to the NumPy predictor when the pickled model
+    # is loaded too; LightGBM itself is faster on bigger batches
+    FAST_MODEL_MAX_BATCH = 100
+    
+    def __init__(self, model_path=None, preprocessor_path=None, date_formats=None,
+                 cache_size=10000, rules=None, fast_model_path=None):
         """
         Initialize the TransactionCategorizer with optional model paths.
         
         Args:
             model_path: Path to the trained model pickle file
             preprocessor_path: Path to the preprocessor pickle file
+            date_formats: Optional list of strptime formats for the Date column
+                (default: DATE_FORMATS)
+            cache_size: Number of descriptions whose features are cached (0 disables)
+            rules: Optional rule table replacing RULES (see rule_engine.load_rules)
+            fast_model_path: Path to a NumPy-only model exported by fast_predictor
         """
         self.model = None
         self.preprocessor = None
+        self.fast_model = None
+        self.date_formats = list(date_formats) if date_formats else list(self.DATE_FORMATS)
+        self._last_date_format = self.date_formats[0]
         
         if model_path and preprocessor_path:
             self.load_model(model_path, preprocessor_path)
+        
+        if fast_model_path:
+            self.load_fast_model(fast_model_path)
             
         self.categories = ['FOOD', 'FRIENDS_FAMILY', 'PURCHASES', 'SHOPPING', 
                           'ENTERTAINMENT', 'TRAVEL', 'UTILITIES', 'INCOME', 'OTHER']
+        
+        # Compile the merchant and keyword lists into a single-pass matcher
+        self.keyword_matcher = KeywordMatcher(
+            self.MERCHANT_GROUPS + [(keyword, [keyword]) for keyword in self.KEYWORDS]
+        )
+        
+        # Description-derived features, keyed on the normalized description
+        self.feature_cache = FeatureCache(cache_size)
+        
+        # Compile the rule table once
+        self.rule_engine = RuleEngine(self.RULES if rules is None else rules)
     
     def load_model(self, model_path, preprocessor_path):
         """
@@ -36,11 +132,9 @@ class TransactionCategorizer:
             preprocessor_path: Path to the preprocessor pickle file
         """
         try:
-            with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
-                
-            with open(preprocessor_path, 'rb') as f:
-                self.preprocessor = pickle.load(f)
+            # Shared with every other categorizer in the process; only unpickled once
+            self.model = load_artifact(model_path)
+            self.preprocessor = load_artifact(preprocessor_path)
                 
             print("Model and preprocessor loaded successfully.")
             return True
@@ -48,6 +142,21 @@ class TransactionCategorizer:
             print(f"Error loading model: {e}")
             return False
     
+    def load_fast_model(self, fast_model_path):
+        """
+        Load a NumPy-only model exported with fast_predictor.export_model.
+        
+        Args:
+            fast_model_path: Path to the exported .npz file
+        """
+        try:
+            self.fast_model = load_artifact(fast_model_path, FastPredictor.load)
+            print("Fast model loaded successfully.")
+            return True
+        except Exception as e:
+            print(f"Error loading fast model: {e}")
+            return False
+    
     def extract_features(self, transaction_data):
         """
         Extract features from a transaction dictionary or DataFrame row.
@@ -66,12 +175,10 @@ class TransactionCategorizer:
             
         features = {}
         
-        # Extract transaction type
+        # Extract transaction type, payee name and keywords
         particulars = transaction.get('Particulars', '')
-        features['TransactionType'] = self.extract_transaction_type(particulars)
-        
-        # Extract payee name
-        payee_name = self.extract_payee_name(particulars)
+        transaction_type, payee_name, keywords = self.describe(particulars)
+        features['TransactionType'] = transaction_type
         features['PayeeName'] = payee_name
         features['HasPayee'] = 0 if payee_name is None else 1
         
@@ -89,20 +196,13 @@ class TransactionCategorizer:
         else:
             features['TransactionAmount'] = transaction.get('TransactionAmount', 0)
         
-        # Extract keywords
-        features['Keywords'] = self.extract_keywords(particulars)
+        features['Keywords'] = keywords
         
         # Extract time-based features
         date = transaction.get('Date')
         if date:
             if isinstance(date, str):
-                try:
-                    date = datetime.strptime(date, '%d-%b-%Y')
-                except:
-                    try:
-                        date = datetime.strptime(date, '%Y-%m-%d')
-                    except:
-                        date = None
+                date = self.parse_date(date)
             
             if date:
                 features['DayOfWeek'] = date.weekday()
@@ -137,6 +237,120 @@ class TransactionCategorizer:
         
         return features
     
+    def parse_date(self, date):
+        """
+        Parse a date string using the configured formats.
+        
+        The format that last succeeded is tried first, so a statement written in
+        a single format parses without raising on every row.
+        
+        Args:
+            date: Date string
+            
+        Returns:
+            datetime, or None if no configured format matches
+        """
+        try:
+            return datetime.strptime(date, self._last_date_format)
+        except ValueError:
+            pass
+        
+        for date_format in self.date_formats:
+            if date_format == self._last_date_format:
+                continue
+            try:
+                parsed = datetime.strptime(date, date_format)
+            except ValueError:
+                continue
+            self._last_date_format = date_format
+            return parsed
+        
+        return None
+    
+    def infer_date_format(self, dates, sample_size=50):
+        """
+        Infer the date format of a column from a sample of its values.
+        
+        Args:
+            dates: pandas Series of date strings
+            sample_size: Number of distinct values to test each format against
+            
+        Returns:
+            The configured format that parses the most sampled values, or None
+        """
+        sample = pd.Series(pd.unique(dates.dropna())[:sample_size], dtype=object)
+        sample = sample[sample.map(lambda value: isinstance(value, str))]
+        
+        best_format, best_count = None, 0
+        for date_format in self.date_formats:
+            count = pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum()
+            if count > best_count:
+                best_format, best_count = date_format, count
+        return best_format
+    
+    @staticmethod
+    def normalize_description(description):
+        """Return the cache key for a description."""
+        # Surrounding whitespace never affects the type, payee or keywords
+        return description.strip()
+    
+    def describe(self, description):
+        """
+        Return the features derived from a description, using the feature cache.
+        
+        Args:
+            description: Transaction description
+            
+        Returns:
+            Tuple of (transaction type, payee name, keywords)
+        """
+        if not isinstance(description, str):
+            return ('OTHER', None, '')
+        
+        key = self.normalize_description(description)
+        described = self.feature_cache.get(key)
+        if described is None:
+            described = (self.extract_transaction_type(description),
+                         self.extract_payee_name(description),
+                         self.extract_keywords(description))
+            self.feature_cache.put(key, described)
+        return described
+    
+    def describe_series(self, descriptions):
+        """
+        Return the features derived from every description in a pandas Series.
+        
+        Each distinct description is looked up in the feature cache once, and
+        the ones not cached are extracted together with column operations.
+        
+        Args:
+            descriptions: pandas Series of transaction descriptions
+            
+        Returns:
+            DataFrame with TransactionType, PayeeName and Keywords columns
+        """
+        text = self._as_text(descriptions)
+        codes, uniques = pd.factorize(text)
+        
+        keys = [self.normalize_description(description) for description in uniques]
+        described = [self.feature_cache.get(key) for key in keys]
+        
+        missing = [i for i, value in enumerate(described) if value is None]
+        if missing:
+            missing_text = pd.Series([uniques[i] for i in missing], dtype=object)
+            types = self.extract_transaction_types(missing_text)
+            payees = self.extract_payee_names(missing_text).to_numpy()
+            keywords = self.extract_keywords_series(missing_text).to_numpy()
+            for j, i in enumerate(missing):
+                described[i] = (types[j], payees[j], keywords[j])
+                self.feature_cache.put(keys[i], described[i])
+        
+        # Non-string descriptions (code -1) take the values describe() gives them
+        table = pd.DataFrame(described + [('OTHER', None, '')],
+                             columns=['TransactionType', 'PayeeName', 'Keywords'], dtype=object)
+        result = table.iloc[codes].set_axis(descriptions.index)
+        return result
+    
     def extract_transaction_type(self, description):
         """Extract the transaction type from the description."""
         if not isinstance(description, str):
@@ -158,58 +372,68 @@ class TransactionCategorizer:
         else:
             return 'OTHER'
     
+    def extract_transaction_types(self, descriptions):
+        """Extract the transaction type of every description in a pandas Series."""
+        upper = self._as_text(descriptions).str.upper()
+        conditions = [
+            self._contains(upper, 'UPI'),
+            self._contains(upper, 'POS') | self._contains(upper, 'BOOKMYSHOW'),
+            self._contains(upper, 'IMPS'),
+            self._contains(upper, 'INT.PD'),
+            self._contains(upper, 'REFUND'),
+            self._contains(upper, 'CMS'),
+        ]
+        choices = ['UPI', 'CARD_PAYMENT', 'IMPS', 'INTEREST', 'REFUND', 'CMS']
+        return np.select(conditions, choices, default='OTHER').astype(object)
+    
     def extract_payee_name(self, description):
         """Extract the payee name from the description."""
         if not isinstance(description, str) or 'UPI' not in description.upper():
             return None
             
         # Try to extract the payee name using pattern between slashes
-        patterns = [
-            r'/([A-Z]{2,}?)/',  # Capture 2+ uppercase letters between slashes
-            r'/([A-Za-z]{2,}?)/',  # Capture 2+ letters between slashes
-            r'([A-Za-z]{3,})@'  # Capture 3+ letters before @
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, description)
-            if matches and len(matches) > 0:
-                return matches[0]
+        for pattern in self.PAYEE_PATTERNS:
+            match = pattern.search(description)
+            if match:
+                return match.group(1)
         
         return None
     
+    def extract_payee_names(self, descriptions):
+        """
+        Extract the payee name from every description in a pandas Series.
+        
+        Each pattern is applied with one vectorized str.extract call, and only
+        to the UPI rows that earlier patterns did not match.
+        
+        Args:
+            descriptions: pandas Series of transaction descriptions
+            
+        Returns:
+            pandas Series of payee names, None where there is no payee
+        """
+        text = self._as_text(descriptions)
+        pending = self._contains(text.str.upper(), 'UPI').to_numpy(copy=True)
+        payees = np.full(len(text), None, dtype=object)
+        
+        for pattern in self.PAYEE_PATTERNS:
+            if not pending.any():
+                break
+            found = text[pending].str.extract(pattern, expand=False)
+            hit = found.notna().to_numpy()
+            positions = np.flatnonzero(pending)[hit]
+            payees[positions] = found.to_numpy()[hit]
+            pending[positions] = False
+        
+        return pd.Series(payees, index=descriptions.index, dtype=object)
+    
     def extract_keywords(self, description):
         """Extract keywords from the description."""
-        if not isinstance(description, str):
-            return ''
-            
-        # List of common keywords to look for
-        keywords = ['food', 'grocery', 'restaurant', 'cinema', 'movie', 'travel', 'uber', 'ola',
-                    'amazon', 'flipkart', 'payment', 'bill', 'recharge', 'salary', 'rent', 
-                    'transfer', 'education', 'health', 'medicine', 'hospital', 'entertainment']
-        
-        found_keywords = []
-        description_lower = description.lower()
-        
-        # Check for common merchants
-        if 'amazon' in description_lower:
-            found_keywords.append('amazon')
-        if 'bookmyshow' in description_lower:
-            found_keywords.append('entertainment')
-        if 'meesho' in description_lower or 'flipkart' in description_lower:
-            found_keywords.append('shopping')
-        if 'jio' in description_lower or 'airtel' in description_lower or 'voda' in description_lower:
-            found_keywords.append('telecom')
-        if 'railway' in description_lower or 'travel' in description_lower or 'cmrl' in description_lower:
-            found_keywords.append('travel')
-        if 'paytm' in description_lower or 'phonepe' in description_lower or 'gpay' in description_lower:
-            found_keywords.append('payment_app')
-        
-        # Check for other keywords
-        for keyword in keywords:
-            if keyword in description_lower:
-                found_keywords.append(keyword)
-        
-        return ','.join(found_keywords) if found_keywords else 'other'
+        return self.keyword_matcher.match(description)
+    
+    def extract_keywords_series(self, descriptions):
+        """Extract keywords from every description in a pandas Series."""
+        return self.keyword_matcher.match_series(descriptions)
     
     def categorize(self, transaction):
         """
@@ -225,33 +449,18 @@ class TransactionCategorizer:
         features = self.extract_features(transaction)
         
         # Apply rule-based logic first
-        if features['TransactionType'] == 'UPI' and features['HasPayee'] == 0 and abs(features['TransactionAmount']) < 200:
-            return 'FOOD'  # UPI transactions without payee name and under $200
-        elif features['TransactionType'] == 'UPI' and features['HasPayee'] == 1 and features['TransactionAmount'] < 0:
-            return 'FRIENDS_FAMILY'  # UPI transactions with payee name
-        elif abs(features['TransactionAmount']) > 200 and features['TransactionAmount'] < 0:
-            return 'PURCHASES'  # Transactions over $200
-        elif features['TransactionType'] == 'INTEREST' or features['TransactionAmount'] > 0:
-            return 'INCOME'
-            
-        # Check keywords for specific categories
-        keywords = features['Keywords'].lower() if isinstance(features['Keywords'], str) else ''
-        
-        if 'amazon' in keywords or 'shopping' in keywords:
-            return 'SHOPPING'
-        elif 'entertainment' in keywords:
-            return 'ENTERTAINMENT'
-        elif 'travel' in keywords:
-            return 'TRAVEL'
-        elif 'telecom' in keywords:
-            return 'UTILITIES'
+        category = self.rule_engine.evaluate_one(features)
+        if category is not None:
+            return category
             
         # If no rules match and model is loaded, use ML model
+        if self.fast_model is not None:
+            # The NumPy predictor avoids the pandas/sklearn overhead of a one-row batch
+            return self.fast_model.predict_one({k: features.get(k, 0) for k in self.MODEL_FEATURES})
+        
         if self.model is not None and self.preprocessor is not None:
             # Keep only the features used in the model
-            model_features = ['TransactionType', 'HasPayee', 'TransactionAmount', 
-                             'DayOfWeek', 'IsWeekend', 'Month', 'IsRoundAmount',
-                             'is_small_upi_no_payee', 'is_upi_with_payee', 'is_large_amount']
+            model_features = self.MODEL_FEATURES
             
             features_df = pd.DataFrame([{k: features[k] for k in model_features if k in features}])
             
@@ -268,6 +477,107 @@ class TransactionCategorizer:
             
         return 'OTHER'  # Default category if no rules match and no model is loaded
     
+    def extract_features_dataframe(self, df, date_format=None):
+        """
+        Extract features for every transaction in a DataFrame using column operations.
+        
+        Produces the same values as calling extract_features on each row.
+        
+        Args:
+            df: pandas DataFrame containing transaction data
+            date_format: Optional format for the Date column (default: inferred)
+            
+        Returns:
+            DataFrame of extracted features aligned with df's index
+        """
+        n = len(df)
+        
+        # Non-string descriptions behave like missing text, as in the per-row path
+        if 'Particulars' in df.columns:
+            particulars = self._as_text(df['Particulars'])
+        else:
+            particulars = pd.Series([''] * n, index=df.index, dtype=object)
+        
+        features = pd.DataFrame(index=df.index)
+        
+        # Extract transaction type, payee name and keywords
+        described = self.describe_series(particulars)
+        features['TransactionType'] = described['TransactionType']
+        features['PayeeName'] = described['PayeeName']
+        features['HasPayee'] = described['PayeeName'].notna().to_numpy().astype(int)
+        
+        # Extract transaction amount
+        if 'Withdrawl' in df.columns and 'Deposit' in df.columns:
+            withdrawl = pd.to_numeric(df['Withdrawl'], errors='coerce').to_numpy(dtype=float)
+            deposit = pd.to_numeric(df['Deposit'], errors='coerce').to_numpy(dtype=float)
+            amount = np.where(withdrawl > 0, -withdrawl, np.where(deposit > 0, deposit, 0.0))
+        elif 'TransactionAmount' in df.columns:
+            amount = pd.to_numeric(df['TransactionAmount'], errors='coerce').to_numpy(dtype=float)
+        else:
+            amount = np.zeros(n)
+        features['TransactionAmount'] = amount
+        features['Keywords'] = described['Keywords']
+        
+        # Extract time-based features
+        if 'Date' in df.columns:
+            dates = self.parse_dates(df['Date'], date_format)
+            day_of_week = dates.dt.dayofweek
+            features['DayOfWeek'] = day_of_week.fillna(0).to_numpy().astype(int)
+            features['IsWeekend'] = (day_of_week >= 5).to_numpy().astype(int)
+            features['Month'] = dates.dt.month.fillna(1).to_numpy().astype(int)
+        else:
+            features['DayOfWeek'] = 0
+            features['IsWeekend'] = 0
+            features['Month'] = 1
+        
+        # Amount-based features
+        abs_amount = np.abs(amount)
+        features['IsRoundAmount'] = (abs_amount % 10 == 0).astype(int)
+        
+        # Rule-based features
+        is_upi = features['TransactionType'].to_numpy() == 'UPI'
+        has_payee = features['HasPayee'].to_numpy() == 1
+        features['is_small_upi_no_payee'] = (is_upi & ~has_payee & (abs_amount < 200)).astype(int)
+        features['is_upi_with_payee'] = (is_upi & has_payee).astype(int)
+        features['is_large_amount'] = (abs_amount > 200).astype(int)
+        
+        return features
+    
+    def categorize_features(self, features):
+        """
+        Categorize a DataFrame of extracted features in one pass.
+        
+        Rules are evaluated as column masks by the rule engine; only the rows no
+        rule matches are sent to the ML model, in a single batched
+        transform/predict call.
+        
+        Args:
+            features: DataFrame returned by extract_features_dataframe
+            
+        Returns:
+            NumPy object array of predicted categories
+        """
+        # Apply rule-based logic first
+        categories = self.rule_engine.evaluate(features)
+        
+        unmatched = np.equal(categories, None)
+        if not unmatched.any():
+            return categories
+        
+        # If no rules match and model is loaded, use ML model on the remaining rows
+        has_model = self.model is not None and self.preprocessor is not None
+        if self.fast_model is not None and (
+                not has_model or unmatched.sum() <= self.FAST_MODEL_MAX_BATCH):
+            categories[unmatched] = self.fast_model.predict(features.loc[unmatched, self.MODEL_FEATURES])
+        elif has_model:
+            features_df = features.loc[unmatched, self.MODEL_FEATURES].reset_index(drop=True)
+            features_processed = self.preprocessor.transform(features_df)
+            categories[unmatched] = self.model.predict(features_processed)
+        else:
+            categories[unmatched] = 'OTHER'
+            
+        return categories
+    
     def categorize_dataframe(self, df):
         """
         Categorize all transactions in a DataFrame.
@@ -278,14 +588,65 @@ class TransactionCategorizer:
         Returns:
             DataFrame with added 'Category' column
         """
-        categories = []
-        for _, row in df.iterrows():
-            categories.append(self.categorize(row))
+        features = self.extract_features_dataframe(df)
             
         result_df = df.copy()
-        result_df['Category'] = categories
+        result_df['Category'] = self.categorize_features(features)
         return result_df
     
+    @staticmethod
+    def _as_text(series):
+        """Return an object Series where non-string values are replaced by NaN."""
+        if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+            return series.astype(object)
+        series = series.astype(object)
+        return series.where(series.map(lambda value: isinstance(value, str)))
+    
+    @staticmethod
+    def _contains(text, substring):
+        """Vectorized substring test on a text Series, treating missing text as no match."""
+        return text.str.contains(substring, regex=False).fillna(False).astype(bool)
+    
+    def parse_dates(self, dates, date_format=None):
+        """
+        Parse a whole Date column, returning datetimes or NaT.
+        
+        The column's format is inferred once from a sample and applied with a
+        single vectorized pd.to_datetime call; any values it leaves unparsed
+        are retried with the other configured formats.
+        
+        Args:
+            dates: pandas Series of dates
+            date_format: Format to try first instead of inferring one
+            
+        Returns:
+            pandas Series of datetime64 values aligned with dates
+        """
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            return dates
+        
+        dates = dates.astype(object)
+        is_text = dates.map(lambda value: isinstance(value, str))
+        text = dates.where(is_text)
+        
+        inferred_format = date_format or self.infer_date_format(text)
+        date_formats = self.date_formats
+        if inferred_format is not None:
+            date_formats = [inferred_format] + [f for f in date_formats if f != inferred_format]
+        
+        parsed = pd.to_datetime(text, format=date_formats[0], errors='coerce')
+        for date_format in date_formats[1:]:
+            missing = parsed.isna() & text.notna()
+            if not missing.any():
+                break
+            parsed[missing] = pd.to_datetime(text[missing], format=date_format, errors='coerce')
+        
+        # datetime-like values (datetime, Timestamp) are used as they are
+        others = dates.where(dates.map(lambda value: hasattr(value, 'weekday')))
+        if others.notna().any():
+            parsed = parsed.fillna(pd.to_datetime(others, errors='coerce'))
+        return parsed
+    
     def categorize_csv(self, input_file, output_file=None):
         """
         Categorize all transactions in a CSV file.
@@ -314,23 +675,71 @@ class TransactionCategorizer:
         except Exception as e:
             print(f"Error processing CSV file: {e}")
             return None
+    
+    def categorize_csv_chunked(self, input_file, output_file, chunksize=50000):
+        """
+        Categorize a CSV file in chunks, appending each chunk to the output file.
+        
+        Only one chunk is held in memory at a time, so statements larger than
+        memory can be processed. The Date format is inferred from the first
+        chunk and reused for the rest, so results match categorize_csv.
+        
+        Args:
+            input_file: Path to input CSV file
+            output_file: Path to output CSV file
+            chunksize: Number of rows read and categorized per chunk
+            
+        Returns:
+            Number of transactions written, or None if processing failed
+        """
+        try:
+            total_rows = 0
+            date_format = None
+            start_time = time.perf_counter()
+            
+            for chunk_num, chunk in enumerate(pd.read_csv(input_file, chunksize=chunksize), 1):
+                chunk_start = time.perf_counter()
+                
+                if chunk_num == 1 and 'Date' in chunk.columns:
+                    date_format = self.infer_date_format(chunk['Date'])
+                
+                # The chunk is not shared, so the category is added in place
+                features = self.extract_features_dataframe(chunk, date_format)
+                chunk['Category'] = self.categorize_features(features)
+                
+                chunk.to_csv(output_file, mode='w' if chunk_num == 1 else 'a',
+                             header=chunk_num == 1, index=False)
+                
+                total_rows += len(chunk)
+                elapsed = time.perf_counter() - chunk_start
+                print(f"Chunk {chunk_num}: {len(chunk)} rows in {elapsed:.2f}s "
+                      f"({len(chunk) / max(elapsed, 1e-9):.0f} rows/s), {total_rows} rows total")
+            
+            elapsed = time.perf_counter() - start_time
+            print(f"Categorized {total_rows} transactions in {elapsed:.2f}s, saved to {output_file}")
+            return total_rows
+            
+        except Exception as e:
+            print(f"Error processing CSV file: {e}")
+            return None
 
 
-from transaction_categorizer import TransactionCategorizer
-import pandas as pd
+if __name__ == "__main__":
+    from transaction_categorizer import TransactionCategorizer
+    import pandas as pd
 
-# Create sample data
-data = {
-    'Date': ['15-Mar-2025', '16-Mar-2025', '17-Mar-2025'],
-    'Particulars': ['UPI/123456/PAYMENT', 'UPI/JOHNDOE/GPAY', 'POS AMAZON'],
-    'Withdrawl': [150, 500, 2000],
-    'Deposit': [0, 0, 0]
-}
-df = pd.DataFrame(data)
+    # Create sample data
+    data = {
+        'Date': ['15-Mar-2025', '16-Mar-2025', '17-Mar-2025'],
+        'Particulars': ['UPI/123456/PAYMENT', 'UPI/JOHNDOE/GPAY', 'POS AMAZON'],
+        'Withdrawl': [150, 500, 2000],
+        'Deposit': [0, 0, 0]
+    }
+    df = pd.DataFrame(data)
 
-# Initialize categorizer
-categorizer = TransactionCategorizer()
+    # Initialize categorizer
+    categorizer = TransactionCategorizer()
 
-# Categorize dataframe
-categorized_df = categorizer.categorize_dataframe(df)
-print(categorized_df)
\ No newline at end of file
+    # Categorize dataframe
+    categorized_df = categorizer.categorize_dataframe(df)
+    print(categorized_df)
@@ -0,0 +1,131 @@
+import os
+import stat
+import threading
+import time
+import uuid
+
+from pdf_extraction import preflight, save_decrypted
+from shared_instances import SharedInstances
+
+# Default location of the working copies, in the application's own directory
+# rather than a predictable path under the shared temp directory
+DEFAULT_ROOT = 'working_copies'
+
+# Working copies unused for this long are deleted
+DEFAULT_TTL_SECONDS = 60 * 60
+
+
+class WorkingCopyCache:
+    """
+    Decrypted working copies of password-protected statements, one directory per user.
+
+    The first successful open of an encrypted PDF writes a copy without its
+    encryption; re-extractions and every page worker then open that copy
+    instead of each running the decryption setup again. Copies are named by
+    the upload's table cache key, which is recorded with the file, so a
+    statement can be extracted again without its password while its copy
+    exists. Copies are only readable by the server's user and are deleted
+    once unused for the TTL. The root and user directories are checked to be
+    private to the server's user before a copy is read from or written to them.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, ttl=DEFAULT_TTL_SECONDS):
+        """
+        Open the cache.
+
+        Args:
+            root: Directory holding every user's working copies
+            ttl: Seconds a copy is kept after it was last used
+        """
+        self.root = root
+        self.ttl = ttl
+        os.makedirs(root, mode=0o700, exist_ok=True)
+        self._check_private(root, stat.S_ISDIR)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _check_private(path, is_type):
+        """
+        Check that a path is not a symlink, is of the expected type, is owned
+        by the server's user and is not accessible to anyone else.
+
+        Raises:
+            PermissionError: If any of these does not hold
+        """
+        info = os.lstat(path)
+        if (not is_type(info.st_mode) or info.st_uid != os.getuid()
+                or info.st_mode & 0o077):
+            raise PermissionError(f"Refusing to use {path}: it is not private to this user")
+
+    def get(self, username, pdf_path, key, password=None):
+        """
+        Return the file and password to extract a statement from.
+
+        Unencrypted PDFs are returned as they are. For encrypted ones the
+        password is checked before any page is parsed, and the decrypted
+        working copy is returned with no password.
+
+        Args:
+            username: Owner of the statement
+            pdf_path: Path to the uploaded PDF, or its contents as bytes
+            key: Table cache key of the upload, naming its working copy
+            password: Password for protected PDFs; not needed while the
+                working copy exists
+
+        Returns:
+            (path, password) to pass on to the extraction
+
+        Raises:
+            PdfPasswordError: If the PDF is encrypted and the password is missing or wrong
+        """
+        self.expire()
+        user_dir = os.path.join(self.root, username)
+        copy_path = os.path.join(user_dir, key + '.pdf')
+        try:
+            self._check_private(user_dir, stat.S_ISDIR)
+            self._check_private(copy_path, stat.S_ISREG)
+            # Mark the copy as recently used
+            os.utime(copy_path)
+            return copy_path, None
+        except FileNotFoundError:
+            pass
+
+        _, encrypted = preflight(pdf_path, password)
+        if not encrypted:
+            return pdf_path, password
+
+        os.makedirs(user_dir, mode=0o700, exist_ok=True)
+        self._check_private(user_dir, stat.S_ISDIR)
+        temp_path = f"{copy_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            # Created private before anything decrypted is written to it
+            os.close(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+            save_decrypted(pdf_path, password, temp_path)
+            os.replace(temp_path, copy_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return copy_path, None
+
+    def expire(self):
+        """Delete working copies not used within the TTL."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for user_entry in os.scandir(self.root):
+                if not user_entry.is_dir():
+                    continue
+                for entry in os.scandir(user_entry.path):
+                    try:
+                        if entry.stat().st_mtime < cutoff:
+                            os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+
+_caches = SharedInstances()
+
+
+def get_working_copies(root=DEFAULT_ROOT, ttl=DEFAULT_TTL_SECONDS):
+    """Return the process-wide WorkingCopyCache."""
+    return _caches.get(lambda: WorkingCopyCache(root, ttl))
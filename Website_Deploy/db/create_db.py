@@ -1,6 +1,10 @@
 import sqlite3
-import bcrypt
 import os
+import sys
+
+# password_hashing lives in the repository's shared directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'shared'))
+from password_hashing import get_hasher
 
 # Ensure 'db' folder exists
 os.makedirs("db", exist_ok=True)
@@ -21,10 +25,9 @@ conn.commit()
 
 # Add a sample user (hashed password)
 def add_user(username, password):
-    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-    # Decode hashed password to string before inserting into DB
+    hashed = get_hasher().hash(password)
     cursor.execute('INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)', 
-                   (username, hashed.decode('utf-8')))
+                   (username, hashed))
     conn.commit()
 
 # Example: Adding a test user
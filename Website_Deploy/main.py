@@ -1,5 +1,14 @@
+import os
+import sys
+
 import streamlit as st
-import sqlite3
+
+# Modules shared with App_implementation live in the repository's shared directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+from user_db import init_db
 
 #BACKGROUND COLOUR
 st.set_page_config(page_title="SALZZ FINANCE",layout="wide")
@@ -23,23 +32,7 @@ st.markdown(
 
 
 
-# Initialize database connection
-def init_db():
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-    
-    # Create table if it doesn't exist
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT NOT NULL UNIQUE,
-        password TEXT NOT NULL
-    )
-    ''')
-    conn.commit()
-    conn.close()
-
-# Initialize DB
+# Initialize DB; the connection pool and schema are set up once per process
 init_db()
 
 st.markdown("""
@@ -143,7 +136,9 @@ st.markdown("""
 
 import streamlit as st
 import pandas as pd
-import pdfplumber
+from pdf_extraction import iter_row_batches
+from upload_writer import save_upload
+from io import BytesIO
 import os
 
 
@@ -153,64 +148,13 @@ os.makedirs(upload_folder, exist_ok=True)
 
 # PDF Extraction Function
 def extract_tables_from_pdf(pdf_path):
-    """Extract tables from PDF and return as DataFrame with cleaned columns"""
-    all_data = []
-    column_names = None
-
+    """Extract tables from PDF (a path or its bytes) and return as DataFrame with cleaned columns"""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                tables = page.extract_table()
-
-                if tables:
-                    # Convert all table cells to strings and handle empty cells
-                    tables = [[str(cell) if cell is not None else '' for cell in row] for row in tables]
-
-                    if not column_names:
-                        # Use the first table's header as column names
-                        column_names = tables[0]
-
-                        # Handle empty column names
-                        column_names = [
-                            f"Unnamed_{i}" if col == '' else col
-                            for i, col in enumerate(column_names)
-                        ]
-
-                        # Fix duplicate column names using pd.Series
-                        column_names = pd.Series(column_names).apply(
-                            lambda x: x if column_names.count(x) == 1 else f"{x}_{column_names.count(x)}"
-                        ).tolist()
-
-                        data_rows = tables[1:]
-
-                        # Adjust rows to match the column count
-                        for row in data_rows:
-                            if len(row) < len(column_names):
-                                row.extend([''] * (len(column_names) - len(row)))  # Pad with empty cells
-                            elif len(row) > len(column_names):
-                                row = row[:len(column_names)]  # Trim excess columns
-                            
-                            all_data.append(row)
-                    else:
-                        # Adjust subsequent tables to match existing headers
-                        for row in tables:
-                            if len(row) < len(column_names):
-                                row.extend([''] * (len(column_names) - len(row)))  # Pad
-                            elif len(row) > len(column_names):
-                                row = row[:len(column_names)]  # Trim
-                            
-                            all_data.append(row)
-
-        # Create DataFrame with cleaned columns
-        if all_data and column_names:
-            df = pd.DataFrame(all_data, columns=column_names)
-            
-            # Ensure no duplicate columns after DataFrame creation using pd.Series
-            df.columns = pd.Series(df.columns).apply(
-                lambda x: x if list(df.columns).count(x) == 1 else f"{x}_{list(df.columns).count(x)}"
-            ).tolist()
-
-            return df
+        # Pages are extracted in parallel worker processes and come back as one
+        # batch per page, with the header named and rows fitted to it
+        batches = list(iter_row_batches(pdf_path))
+        if batches:
+            return pd.concat(batches, ignore_index=True)
         else:
             return None
 
@@ -227,16 +171,17 @@ st.write("Upload a PDF file with tabular data, and extract it into a DataFrame."
 uploaded_file = st.file_uploader("Choose a PDF file", type=["pdf"])
 
 if uploaded_file:
-    # Save the uploaded file
+    # A view of the uploaded bytes, so the upload is not copied; it is saved in
+    # the background while the tables are extracted from memory
+    data = uploaded_file.getbuffer()
     file_path = os.path.join(upload_folder, uploaded_file.name)
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    save_upload(data, file_path)
     
     st.success(f"Uploaded PDF: {uploaded_file.name}")
 
     # Extract data
     with st.spinner("Extracting tables from PDF..."):
-        df = extract_tables_from_pdf(file_path)
+        df = extract_tables_from_pdf(data)
         
         if df is not None:
             st.success("✅ PDF tables extracted successfully!")
@@ -259,16 +204,16 @@ if uploaded_file:
                     mime="text/csv"
                 )
 
-            # Download Excel
+            # Download Excel, built in memory
             with col2:
-                excel = df.to_excel("extracted_data.xlsx", index=False)
-                with open("extracted_data.xlsx", "rb") as f:
-                    st.download_button(
-                        label="Download as Excel",
-                        data=f,
-                        file_name="extracted_data.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                excel = BytesIO()
+                df.to_excel(excel, index=False)
+                st.download_button(
+                    label="Download as Excel",
+                    data=excel.getvalue(),
+                    file_name="extracted_data.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
         else:
             st.error("⚠️ No tables were found in the PDF.")
 
@@ -1,13 +1,18 @@
 import streamlit as st
-import pickle
-import numpy as np
+import os
+import sys
+
+# Modules shared with App_implementation live in the repository's shared directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
 
-# Load the saved KMeans model and Scaler
-with open("kmeans_model (4).pkl", "rb") as model_file:
-    kmeans = pickle.load(model_file)
+import numpy as np
+from model_registry import load_artifact
 
-with open("scaler.pkl", "rb") as scaler_file:
-    scaler = pickle.load(scaler_file)
+# The KMeans model and Scaler are loaded on first use and kept for the whole process
+KMEANS_MODEL_PATH = "kmeans_model (4).pkl"
+SCALER_PATH = "scaler.pkl"
 
 # Set Page Layout
 st.set_page_config(page_title="Financial Clustering & Insights", layout="wide")
@@ -64,6 +69,8 @@ if "cluster" not in st.session_state:
 
 # Predict Cluster
 if st.button("🔍 Find My Cluster", key="cluster_btn"):
+    kmeans = load_artifact(KMEANS_MODEL_PATH)
+    scaler = load_artifact(SCALER_PATH)
     user_data = np.array([[age, income, debt, credit_score, dti_ratio]])
     scaled_data = scaler.transform(user_data)
     st.session_state.cluster = kmeans.predict(scaled_data)[0]
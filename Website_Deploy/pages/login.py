@@ -32,27 +32,65 @@ if st.button("Login"):
         st.markdown("""<div class='cta-button'><a href='/transaction' target='_self'>Transaction</a></div> """, unsafe_allow_html=True)
    '''     
 import streamlit as st
-import sqlite3
-import hashlib
-
-# ✅ Hashing function
-def hash_password(password):
-    """Hash the password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
-
-# ✅ Function to authenticate user
-def authenticate_user(username, password):
-    """Check user credentials from SQLite database"""
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT password FROM users WHERE username = ?", (username,))
-    result = cursor.fetchone()
-
-    conn.close()
-
-    # Compare stored hash with entered password hash
-    return result and result[0] == hash_password(password)
+import os
+import sys
+
+# Modules shared with App_implementation live in the repository's shared directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+from password_hashing import HashingBusyError, get_hasher
+from login_rate_limiter import LoginRateLimited, get_login_limiter
+from user_db import fetch_password_hash, update_password_hash
+
+# ✅ Seconds between looks at a login's password check while it runs
+LOGIN_POLL_INTERVAL = 0.25
+
+# ✅ Address of the client, or None if unknown (st.context.ip_address needs Streamlit 1.45+)
+def client_address():
+    return getattr(getattr(st, 'context', None), 'ip_address', None)
+
+# ✅ Function to start authenticating a user
+def start_login(username, password):
+    """Start checking user credentials from SQLite database, keeping the check in session state"""
+    # Rejects excess attempts before any lookup or hashing; raises LoginRateLimited
+    get_login_limiter().acquire(username, client_address())
+
+    # Verified on the hashing pool; unknown usernames (None) are checked against a
+    # dummy hash, so they take as long as known ones
+    stored_hash = fetch_password_hash(username)
+    st.session_state.pending_login = (username, stored_hash,
+                                      get_hasher().check_async(password, stored_hash))
+
+# ✅ Function to finish authenticating a user once the check is done
+def finish_login(username, stored_hash, check):
+    """Return True if the finished check matched"""
+    matches, new_hash = check.result()
+    # Hashes made with older parameters or schemes are replaced
+    if matches and new_hash:
+        update_password_hash(username, new_hash)
+    if matches:
+        get_login_limiter().record_success(username)
+    return matches
+
+# ✅ Rerun only this section until the check finishes, then rerun the page with the outcome
+@st.fragment(run_every=LOGIN_POLL_INTERVAL)
+def pending_login_section():
+    pending = st.session_state.get("pending_login")
+    if pending is None:
+        return
+    if not pending[2].done():
+        st.info("⏳ Signing in...")
+        return
+
+    del st.session_state.pending_login
+    if finish_login(*pending):
+        st.session_state.authenticated = True
+        st.session_state.username = pending[0]
+    else:
+        st.session_state.login_error = "❌ Invalid username or password"
+    st.rerun()
 
 # ✅ Initialize session state variables
 if "authenticated" not in st.session_state:
@@ -71,15 +109,20 @@ if not st.session_state.authenticated:
 
     # ✅ Login button with unique key
     if st.button("Login", key="login_button"):
-        if authenticate_user(username, password):
-            st.session_state.authenticated = True
-            st.session_state.username = username
-            st.success("✅ Login successful!")
-
-            # ✅ Redirect to the transaction page
-            st.rerun()
-        else:
-            st.error("❌ Invalid username or password")
+        try:
+            # ✅ Checked on the hashing pool; pending_login_section picks up the outcome
+            start_login(username, password)
+        except LoginRateLimited as e:
+            st.error(f"⏳ Too many login attempts. Please try again in {e.retry_after:.0f} seconds.")
+        except HashingBusyError:
+            st.error("⏳ Too many logins right now. Please try again in a moment.")
+
+    # ✅ Outcome of a login whose check finished before this rerun
+    if "login_error" in st.session_state:
+        st.error(st.session_state.pop("login_error"))
+
+    if "pending_login" in st.session_state:
+        pending_login_section()
 
 # ✅ If authenticated, show success message and navigation buttons
 else:
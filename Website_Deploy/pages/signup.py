@@ -1,24 +1,34 @@
 import streamlit as st
-import sqlite3
-import hashlib
+import os
+import sys
+
+# Modules shared with App_implementation live in the repository's shared directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'shared')
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+from password_hashing import HashingBusyError, get_hasher
+from user_db import fetch_password_hash, insert_user
 
 # Hashing function
 def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+    return get_hasher().hash(password)
 
 # Function to add a new user
 def add_user(username, password):
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-    
+    # Skip the hashing work when the username is taken
+    if fetch_password_hash(username) is not None:
+        st.error("Username already exists!")
+        return
     try:
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, hash_password(password)))
-        conn.commit()
+        password_hash = hash_password(password)
+    except HashingBusyError:
+        st.error("Too many sign-ups right now. Please try again in a moment.")
+        return
+    if insert_user(username, password_hash):
         st.success(f"Account created for {username}!")
-    except sqlite3.IntegrityError:
+    else:
         st.error("Username already exists!")
-    
-    conn.close()
 
 st.title("📝 Sign Up Page")
 
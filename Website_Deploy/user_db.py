@@ -0,0 +1,143 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from shared_instances import SharedInstances
+
+DB_PATH = 'users.db'
+
+# Connections kept open per process; more concurrent callers wait for one
+POOL_SIZE = 4
+
+# Seconds a write waits for another connection's lock before failing
+BUSY_TIMEOUT_SECONDS = 5
+
+# Prepared statements each connection keeps compiled
+CACHED_STATEMENTS = 64
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL
+)
+'''
+
+SELECT_PASSWORD = "SELECT password FROM users WHERE username = ?"
+INSERT_USER = "INSERT INTO users (username, password) VALUES (?, ?)"
+UPDATE_PASSWORD = "UPDATE users SET password = ? WHERE username = ?"
+
+
+class ConnectionPool:
+    """
+    SQLite connections shared by every page and session of the process.
+
+    Connections are opened on first need, up to the pool size, and reused,
+    so their prepared statements stay compiled. The database is put in WAL
+    mode, letting logins read while a signup writes.
+    """
+
+    def __init__(self, db_path=DB_PATH, size=POOL_SIZE, timeout=BUSY_TIMEOUT_SECONDS):
+        """
+        Create the pool and set up the schema.
+
+        Args:
+            db_path: Path to the SQLite database file
+            size: Maximum number of open connections
+            timeout: Seconds to wait for a locked database
+        """
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+        with self.connection() as conn:
+            # WAL is a property of the database file, so setting it once is enough
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=CACHED_STATEMENTS)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with block."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                open_new = self._opened < self.size
+                if open_new:
+                    self._opened += 1
+            if open_new:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        """Close the idle connections."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+_pools = SharedInstances()
+
+
+def init_db(db_path=DB_PATH):
+    """Return the process-wide pool of a database, creating it and its schema on first use."""
+    return _pools.get(lambda: ConnectionPool(db_path), db_path)
+
+
+def fetch_password_hash(username, db_path=DB_PATH):
+    """Return the stored password hash of a user, or None if there is no such user."""
+    with init_db(db_path).connection() as conn:
+        row = conn.execute(SELECT_PASSWORD, (username,)).fetchone()
+    return row[0] if row else None
+
+
+def insert_user(username, password_hash, db_path=DB_PATH):
+    """
+    Store a new user.
+
+    Returns:
+        False if the username is already taken, True otherwise
+    """
+    with init_db(db_path).connection() as conn:
+        try:
+            with conn:
+                conn.execute(INSERT_USER, (username, password_hash))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+
+def update_password_hash(username, password_hash, db_path=DB_PATH):
+    """Replace the stored password hash of a user."""
+    with init_db(db_path).connection() as conn:
+        with conn:
+            conn.execute(UPDATE_PASSWORD, (password_hash, username))
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+from shared_instances import SharedInstances
+
+# Login attempts allowed in a burst per username, then one more every 12 seconds
+USERNAME_CAPACITY = 5
+USERNAME_REFILL_PER_SECOND = 1 / 12
+
+# Clients can be several users behind one address, so they get a larger allowance
+CLIENT_CAPACITY = 20
+CLIENT_REFILL_PER_SECOND = 1 / 3
+
+# Buckets kept per limiter before the least recently used ones are dropped
+MAX_KEYS = 100_000
+
+
+class LoginRateLimited(RuntimeError):
+    """Raised when a login attempt is rejected by the rate limiter."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many login attempts; retry in {retry_after:.0f} seconds")
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    """
+    A token bucket per key, refilled lazily from the time it was last used.
+
+    Buckets are kept in least recently used order, so buckets idle long
+    enough to be full again (no different from having none) are dropped
+    from the front as new attempts come in, and at most max_keys are held.
+    """
+
+    def __init__(self, capacity, refill_per_second, max_keys=MAX_KEYS):
+        """
+        Create the limiter.
+
+        Args:
+            capacity: Attempts allowed in a burst
+            refill_per_second: Attempts regained per second
+            max_keys: Buckets held before the least recently used are dropped
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        # key -> (tokens, time of last update)
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        # Time for an empty bucket to fill up again
+        self._idle_seconds = capacity / refill_per_second
+
+    def _tokens(self, key, now):
+        """Return a key's tokens at now; the caller holds the lock."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return self.capacity
+        tokens, updated = bucket
+        return min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+
+    def _evict(self, now):
+        """Drop buckets that are full again, then the oldest beyond max_keys."""
+        while self._buckets:
+            key, (tokens, updated) = next(iter(self._buckets.items()))
+            if now - updated < self._idle_seconds and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+    def available(self, key, now=None):
+        """Return True if the key has an attempt left."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return self._tokens(key, now) >= 1
+
+    def retry_after(self, key, now=None):
+        """Return the seconds until the key has an attempt left."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            missing = 1 - self._tokens(key, now)
+        return max(0.0, missing / self.refill_per_second)
+
+    def consume(self, key, now=None):
+        """Use up one of the key's attempts, if it has one left; return True if it had."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens = self._tokens(key, now)
+            if tokens < 1:
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+            self._evict(now)
+            return True
+
+    def reset(self, key):
+        """Forget a key's attempts."""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class LoginRateLimiter:
+    """
+    Limits login attempts per username and per client address.
+
+    acquire() runs before any credential lookup or hashing, so a rejected
+    attempt costs two dictionary lookups. Every attempt uses up one token of
+    its username and client; a successful login gives the username its
+    allowance back.
+    """
+
+    def __init__(self):
+        self.usernames = TokenBucketLimiter(USERNAME_CAPACITY, USERNAME_REFILL_PER_SECOND)
+        self.clients = TokenBucketLimiter(CLIENT_CAPACITY, CLIENT_REFILL_PER_SECOND)
+        self._lock = threading.Lock()
+
+    def acquire(self, username, client=None):
+        """
+        Admit a login attempt, or reject it if the username or client has no attempts left.
+
+        Args:
+            username: Username being logged in to
+            client: Client address, or None if it is unknown
+
+        Raises:
+            LoginRateLimited: If the attempt must be rejected
+        """
+        limited = [(self.usernames, username)]
+        if client:
+            limited.append((self.clients, client))
+        with self._lock:
+            waits = [limiter.retry_after(key) for limiter, key in limited
+                     if not limiter.available(key)]
+            if waits:
+                raise LoginRateLimited(max(waits))
+            for limiter, key in limited:
+                limiter.consume(key)
+
+    def record_success(self, username):
+        """Give a username its allowance back after a successful login."""
+        self.usernames.reset(username)
+
+
+_limiters = SharedInstances()
+
+
+def get_login_limiter():
+    """Return the process-wide LoginRateLimiter."""
+    return _limiters.get(LoginRateLimiter)
@@ -0,0 +1,95 @@
+import os
+import pickle
+import threading
+import time
+
+
+def unpickle(path):
+    """Load a pickled object from a file."""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class ModelRegistry:
+    """
+    A process-wide store of loaded model artifacts.
+
+    Each artifact is loaded on first use and then shared by every caller in
+    the process. Entries are keyed by absolute path and checked against the
+    file's modification time, so an artifact replaced on disk is reloaded on
+    its next use. The time spent loading each artifact is recorded.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._path_locks = {}
+        self._lock = threading.Lock()
+
+    def _path_lock(self, path):
+        """Return the lock serializing loads of one path."""
+        with self._lock:
+            return self._path_locks.setdefault(path, threading.Lock())
+
+    def get(self, path, loader=unpickle):
+        """
+        Return the artifact stored at path, loading it if needed.
+
+        Args:
+            path: Path to the artifact file
+            loader: Function loading the artifact from a path (default: unpickle)
+
+        Returns:
+            The loaded artifact
+        """
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+
+        entry = self._entries.get(path)
+        if entry is not None and entry['mtime'] == mtime:
+            entry['hits'] += 1
+            return entry['artifact']
+
+        # Only one thread loads a given file; the others wait and reuse its result
+        with self._path_lock(path):
+            entry = self._entries.get(path)
+            if entry is not None and entry['mtime'] == mtime:
+                entry['hits'] += 1
+                return entry['artifact']
+
+            start_time = time.perf_counter()
+            artifact = loader(path)
+            load_seconds = time.perf_counter() - start_time
+
+            loads = entry['loads'] + 1 if entry is not None else 1
+            self._entries[path] = {
+                'artifact': artifact,
+                'mtime': mtime,
+                'load_seconds': load_seconds,
+                'loads': loads,
+                'hits': 0,
+            }
+            action = "Reloaded" if loads > 1 else "Loaded"
+            print(f"{action} {os.path.basename(path)} in {load_seconds:.3f}s")
+            return artifact
+
+    def evict(self, path):
+        """Drop one artifact so it is loaded again on next use."""
+        self._entries.pop(os.path.abspath(path), None)
+
+    def clear(self):
+        """Drop all loaded artifacts."""
+        self._entries.clear()
+
+    def stats(self):
+        """Return load statistics for every loaded artifact, keyed by path."""
+        return {path: {key: value for key, value in entry.items() if key != 'artifact'}
+                for path, entry in list(self._entries.items())}
+
+
+# The registry shared by the whole process
+registry = ModelRegistry()
+
+
+def load_artifact(path, loader=unpickle):
+    """Return the artifact at path from the process-wide registry."""
+    return registry.get(path, loader)
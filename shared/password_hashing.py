@@ -0,0 +1,274 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from shared_instances import SharedInstances
+
+# bcrypt is only needed to verify hashes written by db/create_db.py
+try:
+    import bcrypt
+except ImportError:
+    bcrypt = None
+
+# Cost parameters written by the calibrate command
+HASHING_CONFIG_FILE = 'password_hashing.json'
+
+# scrypt cost used until the calibrate command has been run: N = 2 ** log_n
+DEFAULT_PARAMETERS = {'log_n': 15, 'r': 8, 'p': 1}
+
+# Time one hash should take on the server, in milliseconds
+DEFAULT_TARGET_MS = 250
+
+# Calibration stops here even if hashing is still faster than the target (128 MiB at r=8)
+MAX_LOG_N = 17
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# Seconds a caller waits for a free verification slot before giving up
+SUBMIT_TIMEOUT_SECONDS = 10
+
+# Secret of the hash verified against when an account does not exist
+DUMMY_SECRET = 'no-such-account'
+
+# scrypt$<log_n>$<r>$<p>$<salt>$<key>, salt and key in unpadded base64
+SCRYPT_HASH = re.compile(r'scrypt\$(\d+)\$(\d+)\$(\d+)\$([A-Za-z0-9+/]+)\$([A-Za-z0-9+/]+)')
+
+# Unsalted SHA-256 hex digests written by earlier versions
+LEGACY_SHA256_HASH = re.compile(r'[0-9a-f]{64}')
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when too many hashes are already waiting to be computed."""
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def scrypt_key(secret, salt, log_n, r, p):
+    """Derive the scrypt key of a secret."""
+    n = 1 << log_n
+    return hashlib.scrypt(secret.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * r * (n + p + 2) + (1 << 20), dklen=KEY_BYTES)
+
+
+def load_parameters(path=HASHING_CONFIG_FILE):
+    """Return the calibrated cost parameters, or the defaults if there are none."""
+    parameters = dict(DEFAULT_PARAMETERS)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            stored = json.load(f)
+        parameters.update({key: int(stored[key]) for key in DEFAULT_PARAMETERS if key in stored})
+    return parameters
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords with scrypt, at a cost calibrated for the server.
+
+    The key derivation runs on a bounded thread pool (hashlib releases the
+    GIL while it works), so a burst of logins queues up there instead of
+    every session thread hashing at once. hash() and check() wait for their
+    result; hash_async() and check_async() return the Future at once, so a
+    login can keep it and poll instead of holding its script thread.
+    Hashes record their parameters; check() reports a new hash whenever the
+    stored one was made with other parameters or an older scheme, so it can
+    be replaced on login. Checks against a missing account verify a dummy
+    hash, so they take as long as checks against a real one.
+    """
+
+    def __init__(self, parameters=None, workers=None, max_pending=None):
+        """
+        Start the hasher.
+
+        Args:
+            parameters: scrypt 'log_n', 'r' and 'p' (default: load_parameters())
+            workers: Hashes computed at the same time (default: number of CPUs)
+            max_pending: Hashes queued or running before callers have to wait
+                (default: 8 per worker)
+        """
+        self.parameters = dict(parameters or load_parameters())
+        workers = workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix='password-hashing')
+        self._slots = threading.BoundedSemaphore(max_pending or workers * 8)
+        self._dummy_hash = None
+        self._dummy_lock = threading.Lock()
+
+    def _submit(self, fn, *args, timeout=SUBMIT_TIMEOUT_SECONDS):
+        """Run fn on the pool and return its Future, waiting up to timeout seconds for a slot."""
+        if not self._slots.acquire(timeout=timeout):
+            raise HashingBusyError("Too many password checks in progress")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _hash(self, secret):
+        salt = os.urandom(SALT_BYTES)
+        log_n, r, p = (self.parameters[key] for key in ('log_n', 'r', 'p'))
+        key = scrypt_key(secret, salt, log_n, r, p)
+        return f"scrypt${log_n}${r}${p}${_b64encode(salt)}${_b64encode(key)}"
+
+    def _verify(self, secret, stored_hash):
+        match = SCRYPT_HASH.fullmatch(stored_hash)
+        if match:
+            log_n, r, p = (int(value) for value in match.group(1, 2, 3))
+            key = scrypt_key(secret, _b64decode(match.group(4)), log_n, r, p)
+            return hmac.compare_digest(key, _b64decode(match.group(5)))
+        if LEGACY_SHA256_HASH.fullmatch(stored_hash):
+            digest = hashlib.sha256(secret.encode('utf-8')).hexdigest()
+            return hmac.compare_digest(digest, stored_hash)
+        if stored_hash.startswith('$2') and bcrypt is not None:
+            return bcrypt.checkpw(secret.encode('utf-8'), stored_hash.encode('utf-8'))
+        return False
+
+    def _get_dummy_hash(self):
+        with self._dummy_lock:
+            if self._dummy_hash is None:
+                self._dummy_hash = self._hash(DUMMY_SECRET)
+            return self._dummy_hash
+
+    def _check(self, secret, stored_hash):
+        if stored_hash is None:
+            # Same work as a real check, so response times do not reveal which accounts exist
+            self._verify(secret, self._get_dummy_hash())
+            return False, None
+        if not self._verify(secret, stored_hash):
+            return False, None
+        return True, self._hash(secret) if self.needs_rehash(stored_hash) else None
+
+    def needs_rehash(self, stored_hash):
+        """Return True if a hash was not made with the current scheme and parameters."""
+        match = SCRYPT_HASH.fullmatch(stored_hash)
+        if not match:
+            return True
+        current = tuple(self.parameters[key] for key in ('log_n', 'r', 'p'))
+        return tuple(int(value) for value in match.group(1, 2, 3)) != current
+
+    def hash_async(self, secret):
+        """Return a Future of the hash of a secret."""
+        return self._submit(self._hash, secret)
+
+    def hash(self, secret):
+        """Hash a secret, waiting for the result."""
+        return self.hash_async(secret).result()
+
+    def check_async(self, secret, stored_hash):
+        """
+        Verify a secret against a stored hash on the pool, without waiting.
+
+        Besides scrypt hashes, unsalted SHA-256 hex digests and (when bcrypt
+        is installed) bcrypt hashes are accepted, so accounts created before
+        this service keep working.
+
+        Args:
+            secret: Secret to verify
+            stored_hash: Hash stored for the account, or None if there is no
+                such account; a dummy hash is verified instead and the check fails
+
+        Returns:
+            Future of (True if the secret matches, new hash to store or None)
+
+        Raises:
+            HashingBusyError: If every verification slot is taken
+        """
+        return self._submit(self._check, secret, stored_hash, timeout=0)
+
+    def check(self, secret, stored_hash):
+        """
+        Verify a secret against a stored hash, waiting for the result (see check_async).
+
+        Raises:
+            HashingBusyError: If no verification slot frees up in time
+        """
+        return self._submit(self._check, secret, stored_hash).result()
+
+
+def calibrate(target_ms=DEFAULT_TARGET_MS, r=DEFAULT_PARAMETERS['r'], p=DEFAULT_PARAMETERS['p']):
+    """
+    Find the scrypt cost whose hashing time on this machine is closest to a target.
+
+    Returns:
+        (parameters, measured milliseconds per hash)
+    """
+    salt = os.urandom(SALT_BYTES)
+    timings = {}
+    for log_n in range(10, MAX_LOG_N + 1):
+        # Best of three, so a busy moment does not skew the result
+        runs = []
+        for _ in range(3):
+            start = time.perf_counter()
+            scrypt_key('calibration', salt, log_n, r, p)
+            runs.append((time.perf_counter() - start) * 1000)
+        timings[log_n] = min(runs)
+        if timings[log_n] >= target_ms:
+            break
+    log_n = min(timings, key=lambda log_n: abs(timings[log_n] - target_ms))
+    return {'log_n': log_n, 'r': r, 'p': p}, timings[log_n]
+
+
+_hashers = SharedInstances()
+
+
+def get_hasher():
+    """Return the process-wide PasswordHasher."""
+    return _hashers.get(PasswordHasher)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate and benchmark password hashing.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    calibrate_parser = subparsers.add_parser(
+        'calibrate', help=f"Pick the scrypt cost for a target latency and save it to {HASHING_CONFIG_FILE}")
+    calibrate_parser.add_argument('--target-ms', type=float, default=DEFAULT_TARGET_MS,
+                                  help="Time one hash should take (default: %(default)s)")
+    calibrate_parser.add_argument('--dry-run', action='store_true',
+                                  help="Print the parameters without saving them")
+    benchmark_parser = subparsers.add_parser(
+        'benchmark', help="Measure hashing time and throughput with the current parameters")
+    benchmark_parser.add_argument('--hashes', type=int, default=20,
+                                  help="Number of hashes to compute (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.command == 'calibrate':
+        parameters, elapsed_ms = calibrate(args.target_ms)
+        print(f"log_n={parameters['log_n']} r={parameters['r']} p={parameters['p']}: "
+              f"{elapsed_ms:.1f} ms per hash (target {args.target_ms:.0f} ms)")
+        if not args.dry_run:
+            with open(HASHING_CONFIG_FILE, 'w') as f:
+                json.dump({**parameters, 'target_ms': args.target_ms,
+                           'measured_ms': round(elapsed_ms, 1)}, f, indent=4)
+            print(f"Saved to {HASHING_CONFIG_FILE}; existing hashes are updated as users log in")
+    else:
+        hasher = PasswordHasher()
+        start = time.perf_counter()
+        futures = [hasher.hash_async(f"benchmark-{i}") for i in range(max(args.hashes, 1))]
+        hashes = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        single_start = time.perf_counter()
+        hasher.check('benchmark-0', hashes[0])
+        single_ms = (time.perf_counter() - single_start) * 1000
+        print(f"Parameters: {hasher.parameters}")
+        print(f"Single verification: {single_ms:.1f} ms")
+        print(f"{args.hashes} hashes on the pool: {elapsed:.2f} s "
+              f"({args.hashes / elapsed:.1f} hashes/s)")
+
+
+if __name__ == '__main__':
+    main()
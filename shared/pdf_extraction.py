@@ -0,0 +1,433 @@
+import argparse
+import ctypes
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pdfplumber
+import pypdfium2
+
+from statement_layouts import detect_layout, extract_layout_table, page_rules, page_words
+
+# Statements shorter than this are extracted in-process; starting workers costs more
+MIN_PAGES_FOR_POOL = 8
+
+# Page ranges handed out per worker, so slow pages even out across the pool
+RANGES_PER_WORKER = 2
+
+# Largest page range given to one task; bounds the tables held per worker result
+MAX_PAGES_PER_RANGE = 16
+
+# Worker pool of the process, one worker per CPU, created on first use; a call's
+# workers argument limits how many of its page ranges run at the same time
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class PdfPasswordError(ValueError):
+    """Raised when a PDF is encrypted and its password is missing or wrong."""
+
+
+def _iter_page_range(pdf_path, password, start, stop, layout=None):
+    """Open the PDF (a path or its bytes) and yield the table of each page in [start, stop)."""
+    if layout is not None:
+        # Known layout: read the text layer with fixed column boundaries
+        pdf = open_document(pdf_path, password)
+        try:
+            for index in range(start, stop):
+                page = pdf[index]
+                table = extract_layout_table(page_words(page), layout, page_rules(page))
+                page.close()
+                yield table
+        finally:
+            pdf.close()
+        return
+
+    # pdfplumber reads bytes through a stream; BytesIO shares bytes objects without copying
+    source = pdf_path if isinstance(pdf_path, (str, os.PathLike)) else io.BytesIO(pdf_path)
+    with pdfplumber.open(source, password=password,
+                         pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            table = page.extract_table()
+            # Drop the parsed page objects as soon as the page is done
+            page.close()
+            yield table
+
+
+def _extract_page_range(task):
+    """Extract the tables of a page range inside a worker process."""
+    pdf_path, password, start, stop, layout = task
+    return list(_iter_page_range(pdf_path, password, start, stop, layout))
+
+
+def _get_executor():
+    """Return the shared process pool, creating it if needed."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned workers: forking the threaded Streamlit server is not safe
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def _discard_executor(executor):
+    """Shut down a broken pool and stop handing it out, unless a new one was already started."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def open_document(source, password=None):
+    """
+    Open a PDF with PDFium.
+
+    Args:
+        source: Path to the PDF file, its bytes (or a memoryview of them)
+            or a binary file object
+        password: Password for protected PDFs
+
+    Returns:
+        pypdfium2.PdfDocument; the caller closes it
+
+    Raises:
+        PdfPasswordError: If the PDF is encrypted and the password is missing or wrong
+    """
+    if isinstance(source, memoryview):
+        # PDFium reads a ctypes array over the view in place; read-only views are copied
+        source = (source.tobytes() if source.readonly
+                  else (ctypes.c_char * source.nbytes).from_buffer(source))
+    try:
+        return pypdfium2.PdfDocument(source, password=password)
+    except pypdfium2.PdfiumError as e:
+        if getattr(e, 'err_code', None) == pypdfium2.raw.FPDF_ERR_PASSWORD:
+            message = "Incorrect PDF password" if password else "This PDF is password-protected"
+            raise PdfPasswordError(message) from e
+        raise
+
+
+def preflight(source, password=None):
+    """
+    Check that a PDF opens with the given password, without parsing any page.
+
+    Only the document structure is read, so a wrong password or a broken
+    file is reported before any extraction work is queued.
+
+    Args:
+        source: Path to the PDF file, its bytes or a binary file object
+        password: Password for protected PDFs
+
+    Returns:
+        (number of pages, True if the PDF is encrypted)
+
+    Raises:
+        PdfPasswordError: If the PDF is encrypted and the password is missing or wrong
+    """
+    pdf = open_document(source, password)
+    try:
+        return len(pdf), pypdfium2.raw.FPDF_GetSecurityHandlerRevision(pdf.raw) != -1
+    finally:
+        pdf.close()
+
+
+def page_count(pdf_path, password=None):
+    """Return the number of pages in a PDF."""
+    return preflight(pdf_path, password)[0]
+
+
+def save_decrypted(pdf_path, password, output_path):
+    """Write a copy of an encrypted PDF with its encryption removed."""
+    pdf = open_document(pdf_path, password)
+    try:
+        pdf.save(output_path, flags=pypdfium2.raw.FPDF_REMOVE_SECURITY)
+    finally:
+        pdf.close()
+
+
+def inspect_pdf(pdf_path, password=None):
+    """
+    Return the number of pages in a PDF and the layout detected on its first page.
+
+    The layout is None when the first page's header matches no registered
+    layout; such statements are extracted with page.extract_table().
+    """
+    pdf = open_document(pdf_path, password)
+    try:
+        if len(pdf) == 0:
+            return 0, None
+        page = pdf[0]
+        layout = detect_layout(page_words(page))
+        page.close()
+        return len(pdf), layout
+    finally:
+        pdf.close()
+
+
+def page_ranges(n_pages, n_ranges):
+    """Split n_pages into at most n_ranges contiguous (start, stop) ranges."""
+    n_ranges = max(1, min(n_ranges, n_pages))
+    size, extra = divmod(n_pages, n_ranges)
+    ranges = []
+    start = 0
+    for i in range(n_ranges):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def iter_page_tables(pdf_path, password=None, workers=None):
+    """
+    Yield the table of every page of a PDF in page order.
+
+    Long statements are split into contiguous page ranges, each extracted by
+    a worker process that opens the PDF itself. An upload still in memory
+    can be passed as bytes; short ones are extracted without touching the
+    disk, long ones are written to a temporary file once so the workers do
+    not each receive a copy. Only a few ranges are in flight at a time, so
+    memory does not grow with the number of pages.
+    Statements in a known layout are read from the text layer with fixed
+    column boundaries instead of table geometry analysis.
+
+    Args:
+        pdf_path: Path to the PDF file, or its contents as bytes or a memoryview
+        password: Password for protected PDFs
+        workers: Page ranges extracted at the same time (default: number of CPUs)
+
+    Yields:
+        The table of each page as a list of rows, or None if the page has none
+    """
+    n_pages, layout = inspect_pdf(pdf_path, password)
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or n_pages < MIN_PAGES_FOR_POOL:
+        yield from _iter_page_range(pdf_path, password, 0, n_pages, layout)
+        return
+
+    if isinstance(pdf_path, (str, os.PathLike)):
+        yield from _iter_page_tables_pooled(pdf_path, password, n_pages, layout, workers)
+        return
+
+    fd, temp_path = tempfile.mkstemp(suffix='.pdf')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_path)
+        yield from _iter_page_tables_pooled(temp_path, password, n_pages, layout, workers)
+    finally:
+        os.remove(temp_path)
+
+
+def _iter_page_tables_pooled(pdf_path, password, n_pages, layout, workers):
+    """Yield the table of every page of a PDF file, extracted on the shared process pool."""
+    n_ranges = max(workers * RANGES_PER_WORKER, -(-n_pages // MAX_PAGES_PER_RANGE))
+    tasks = deque((pdf_path, password, start, stop, layout)
+                  for start, stop in page_ranges(n_pages, n_ranges))
+    done = 0
+    executor = _get_executor()
+    try:
+        in_flight = deque()
+        while tasks or in_flight:
+            while tasks and len(in_flight) < workers * RANGES_PER_WORKER:
+                in_flight.append(executor.submit(_extract_page_range, tasks.popleft()))
+            # Results are consumed in submission order, whichever finishes first
+            range_tables = in_flight.popleft().result()
+            done += len(range_tables)
+            yield from range_tables
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool next time and finish in-process
+        _discard_executor(executor)
+        yield from _iter_page_range(pdf_path, password, done, n_pages, layout)
+
+
+def extract_page_tables(pdf_path, password=None, workers=None):
+    """
+    Extract the table of every page of a PDF, in parallel for long statements.
+
+    Args:
+        pdf_path: Path to the PDF file, or its contents as bytes
+        password: Password for protected PDFs
+        workers: Page ranges extracted at the same time (default: number of CPUs)
+
+    Returns:
+        List with one entry per page: the table as a list of rows, or None
+    """
+    return list(iter_page_tables(pdf_path, password, workers))
+
+
+def _normalize_table(table):
+    """Return a table's cells with empty cells as '' and whitespace runs as single spaces."""
+    return [[' '.join((cell or '').split()) for cell in row] for row in table or []]
+
+
+def check_layout(pdf_path, password=None):
+    """
+    Compare the fixed-column extraction of a statement with page.extract_table().
+
+    Run it on statements of a layout after registering the layout or changing
+    statement_layouts; cells are compared with whitespace normalized.
+
+    Args:
+        pdf_path: Path to the PDF file, or its contents as bytes
+        password: Password for protected PDFs
+
+    Returns:
+        (detected layout or None, list of (page number, layout table,
+        extract_table table) for every page where the two differ)
+    """
+    n_pages, layout = inspect_pdf(pdf_path, password)
+    if layout is None:
+        return None, []
+    mismatches = []
+    pages = zip(_iter_page_range(pdf_path, password, 0, n_pages, layout),
+                _iter_page_range(pdf_path, password, 0, n_pages))
+    for page_num, (table, expected) in enumerate(pages, 1):
+        if _normalize_table(table) != _normalize_table(expected):
+            mismatches.append((page_num, table, expected))
+    return layout, mismatches
+
+
+def clean_header(header):
+    """Name empty header cells and make duplicate names unique."""
+    names = [f"Unnamed_{i}" if cell in (None, '') else str(cell) for i, cell in enumerate(header)]
+    return [name if names.count(name) == 1 else f"{name}_{names.count(name)}" for name in names]
+
+
+def iter_row_batches(pdf_path, password=None, numeric_columns=None, workers=None,
+                     progress=None):
+    """
+    Yield the transactions of a statement PDF as one DataFrame per page.
+
+    The first table's first row is the header; later tables repeating it
+    have it skipped, and tables with a different header are kept whole.
+    Cells are strings ('' when empty) and rows are padded or trimmed to the
+    header width, so every batch has the same columns.
+
+    Args:
+        pdf_path: Path to the PDF file, or its contents as bytes
+        password: Password for protected PDFs
+        numeric_columns: Columns parsed as float64 (thousands separators removed,
+            unparseable values become NaN), so every batch has the same dtypes
+        workers: Page ranges extracted at the same time (default: number of CPUs)
+        progress: Optional callback called with (page number, page count,
+            rows found on the page) after each page
+
+    Yields:
+        DataFrame of the rows found on each page that has any
+    """
+    columns = None
+    header = None
+    n_pages = page_count(pdf_path, password) if progress else None
+    for page_num, table in enumerate(iter_page_tables(pdf_path, password, workers), 1):
+        if progress:
+            progress(page_num, n_pages, len(table) if table else 0)
+        if not table:
+            continue
+
+        rows = table
+        if header is None:
+            header = table[0]
+            columns = clean_header(header)
+            rows = table[1:]
+        elif table[0] == header:
+            rows = table[1:]
+
+        width = len(columns)
+        rows = [[('' if cell is None else str(cell)) for cell in row[:width]]
+                + [''] * (width - len(row)) for row in rows]
+        if not rows:
+            continue
+
+        batch = pd.DataFrame(rows, columns=columns)
+        for column in numeric_columns or []:
+            if column in batch.columns:
+                batch[column] = pd.to_numeric(batch[column].str.replace(',', '', regex=False),
+                                              errors='coerce').astype('float64')
+        yield batch
+
+
+def write_row_batches(batches, output_path):
+    """
+    Write DataFrame batches to a CSV or Parquet file as they arrive.
+
+    Args:
+        batches: Iterable of DataFrames with the same columns
+        output_path: Path of the output file; '.parquet' selects Parquet, otherwise CSV
+
+    Returns:
+        Number of rows written
+    """
+    rows = 0
+    if output_path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for batch in batches:
+                table = pa.Table.from_pandas(batch, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+                rows += len(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    first = True
+    for batch in batches:
+        batch.to_csv(output_path, mode='w' if first else 'a', header=first, index=False)
+        first = False
+        rows += len(batch)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the transaction table of a statement PDF to CSV or Parquet.")
+    parser.add_argument('pdf_path', help="Statement PDF")
+    parser.add_argument('output_path', nargs='?', help="Output .csv or .parquet file")
+    parser.add_argument('--password', default=None, help="Password for protected PDFs")
+    parser.add_argument('--numeric', nargs='*', default=['Withdrawl', 'Deposit', 'Balance'],
+                        help="Columns parsed as numbers")
+    parser.add_argument('--workers', type=int, default=None, help="Page ranges extracted at the same time")
+    parser.add_argument('--check-layout', action='store_true',
+                        help="Compare the layout extraction with page.extract_table() instead of writing rows")
+    args = parser.parse_args()
+
+    if args.check_layout:
+        layout, mismatches = check_layout(args.pdf_path, args.password)
+        if layout is None:
+            print(f"{args.pdf_path}: no registered layout detected")
+            return
+        for page_num, table, expected in mismatches:
+            found = _normalize_table(table)
+            reference = _normalize_table(expected)
+            first = next((i for i, (a, b) in enumerate(zip(found, reference)) if a != b),
+                         min(len(found), len(reference)))
+            print(f"Page {page_num}: {len(found)} rows, extract_table has {len(reference)}; "
+                  f"first difference at row {first}")
+            print(f"  layout:        {found[first] if first < len(found) else None}")
+            print(f"  extract_table: {reference[first] if first < len(reference) else None}")
+        print(f"{args.pdf_path}: layout {layout['name']!r}, {len(mismatches)} mismatched pages")
+        sys.exit(1 if mismatches else 0)
+    if args.output_path is None:
+        parser.error("output_path is required unless --check-layout is given")
+
+    rows = write_row_batches(
+        iter_row_batches(args.pdf_path, args.password, args.numeric, args.workers),
+        args.output_path,
+    )
+    print(f"Wrote {rows} rows to {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+
+
+class SharedInstances:
+    """
+    Objects shared by every Streamlit session of the process, one per key.
+
+    Sessions run as threads of one server process, so stores, caches and
+    pools are created once, on first use, and then handed to every caller.
+    Creation happens under a lock, so two sessions starting together still
+    get the same object.
+    """
+
+    def __init__(self, max_instances=None):
+        """
+        Create the registry.
+
+        Args:
+            max_instances: Instances kept before the least recently used one
+                is dropped (default: no limit). A dropped instance is not
+                closed; callers still holding it keep using it, and it is
+                freed once the last of them is done.
+        """
+        self.max_instances = max_instances
+        self._instances = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, create, key=None):
+        """
+        Return the instance for a key, creating it the first time.
+
+        Args:
+            create: Function called without arguments to create the instance
+            key: Identifies the instance, e.g. its database path; None when
+                there is only one
+
+        Returns:
+            The shared instance
+        """
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is None:
+                instance = create()
+                self._instances[key] = instance
+                if self.max_instances is not None and len(self._instances) > self.max_instances:
+                    self._instances.popitem(last=False)
+            else:
+                self._instances.move_to_end(key)
+            return instance
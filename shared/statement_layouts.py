@@ -0,0 +1,272 @@
+import bisect
+import re
+
+import pypdfium2.raw as pdfium_c
+
+# Registered statement layouts, tried in order against the first page's header
+LAYOUTS = []
+
+# Words whose tops differ by at most this many points are on the same line
+LINE_TOLERANCE = 3
+
+# Characters further apart than this many points start a new word
+WORD_GAP = 3
+
+# A wrapped line starts at most this many line heights below the line above it
+WRAP_GAP = 1.0
+
+# Path objects at most this many points tall are horizontal rules
+RULE_THICKNESS = 2
+
+
+def register_layout(name, columns, row_start, wrap_columns=(), right_aligned=(),
+                    boundaries=None):
+    """
+    Register a fixed-column statement layout.
+
+    Layouts must be registered when this module is imported, so that the
+    extraction worker processes know them too.
+
+    Args:
+        name: Unique layout name
+        columns: Header cells, left to right, exactly as printed
+        row_start: Regular expression the first column of a new row matches
+        wrap_columns: Columns whose text may wrap onto following lines
+        right_aligned: Columns whose values are right-aligned, like amounts
+        boundaries: x positions separating the columns; derived from the
+            header's position on the first page when omitted
+    """
+    LAYOUTS.append({
+        'name': name,
+        'columns': list(columns),
+        'row_start': re.compile(row_start),
+        'wrap_columns': [list(columns).index(column) for column in wrap_columns],
+        'right_aligned': [list(columns).index(column) for column in right_aligned],
+        'boundaries': list(boundaries) if boundaries else None,
+    })
+
+
+register_layout(
+    'date_particulars_ref_amounts',
+    ['Date', 'Particulars', 'Chq./Ref.No.', 'Withdrawl', 'Deposit', 'Balance'],
+    row_start=r'\d{1,2}-[A-Za-z]{3}-\d{4}|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{2,4}',
+    wrap_columns=['Particulars'],
+    right_aligned=['Withdrawl', 'Deposit', 'Balance'],
+)
+
+
+def get_layout(name):
+    """Return the registered layout with the given name."""
+    for layout in LAYOUTS:
+        if layout['name'] == name:
+            return layout
+    raise KeyError(f"Unknown statement layout {name!r}")
+
+
+def page_words(page):
+    """
+    Read the words of a page from its text layer.
+
+    Characters and their boxes come straight from PDFium, which is much
+    cheaper than building pdfplumber's character objects.
+
+    Args:
+        page: pypdfium2 page
+
+    Returns:
+        List of word dictionaries with 'text', 'x0', 'x1', 'top' and 'bottom'
+    """
+    textpage = page.get_textpage()
+    try:
+        n_chars = textpage.count_chars()
+        text = textpage.get_text_range()
+        if len(text) != n_chars:
+            text = ''.join(textpage.get_text_range(i, 1) or ' ' for i in range(n_chars))
+
+        words = []
+        current = None
+        for i, char in enumerate(text):
+            if char.isspace():
+                current = None
+                continue
+            # Loose boxes span the font height, so characters on a line share a top
+            left, bottom, right, top = textpage.get_charbox(i, loose=True)
+            if (current is None or left - current['x1'] > WORD_GAP
+                    or abs(current['top'] + top) > LINE_TOLERANCE):
+                # PDF y grows upwards; store top as a downward distance like pdfplumber
+                current = {'text': char, 'x0': left, 'x1': right, 'top': -top, 'bottom': -bottom}
+                words.append(current)
+            else:
+                current['text'] += char
+                current['x1'] = max(current['x1'], right)
+        return words
+    finally:
+        textpage.close()
+
+
+def page_rules(page):
+    """
+    Read the horizontal rules drawn on a page.
+
+    Args:
+        page: pypdfium2 page
+
+    Returns:
+        List of rule dictionaries with 'x0', 'x1' and 'top', top measured like page_words()
+    """
+    rules = []
+    for path in page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_PATH,)):
+        left, bottom, right, top = path.get_bounds()
+        if top - bottom <= RULE_THICKNESS:
+            rules.append({'x0': left, 'x1': right, 'top': -(top + bottom) / 2})
+    return rules
+
+
+def _table_bottom(rules, boundaries, below=None):
+    """
+    Return the top of the lowest rule spanning every column, or None if there is none.
+
+    Args:
+        rules: page_rules() of the page
+        boundaries: Column boundaries of the layout
+        below: Only rules lower than this top are considered, e.g. the header's
+    """
+    tops = [rule['top'] for rule in rules
+            if rule['x0'] <= boundaries[0] and rule['x1'] >= boundaries[-1]
+            and (below is None or rule['top'] > below)]
+    return max(tops) if tops else None
+
+
+def _lines(words):
+    """Group words into lines, top to bottom, each sorted left to right."""
+    lines = []
+    for word in sorted(words, key=lambda word: (word['top'], word['x0'])):
+        if lines and abs(word['top'] - lines[-1][0]['top']) <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda word: word['x0']) for line in lines]
+
+
+def _find_header(lines, columns):
+    """
+    Find the line holding a layout's header.
+
+    Returns:
+        (line index, [(x0, x1) of each column's header]) or None
+    """
+    for index, line in enumerate(lines):
+        spans = []
+        position = 0
+        for column in columns:
+            # A header cell may span several words
+            for end in range(position + 1, len(line) + 1):
+                if ' '.join(word['text'] for word in line[position:end]) == column:
+                    spans.append((line[position]['x0'], line[end - 1]['x1']))
+                    position = end
+                    break
+            else:
+                break
+        if len(spans) == len(columns):
+            return index, spans
+    return None
+
+
+def _boundaries(layout, spans):
+    """Derive column boundaries from the header's position on the page."""
+    boundaries = []
+    for i, (left, right) in enumerate(zip(spans, spans[1:]), 1):
+        if i in layout['right_aligned']:
+            # Right-aligned values can extend left of their header
+            boundaries.append((left[1] + right[0]) / 2)
+        else:
+            boundaries.append(right[0] - 1)
+    return boundaries
+
+
+def detect_layout(words):
+    """
+    Match a page's header against the registered layouts.
+
+    Args:
+        words: page_words() of a page, normally the statement's first page
+
+    Returns:
+        Dictionary with the layout 'name' and its column 'boundaries', or None
+    """
+    lines = _lines(words)
+    for layout in LAYOUTS:
+        found = _find_header(lines, layout['columns'])
+        if found is None:
+            continue
+        _, spans = found
+        boundaries = layout['boundaries'] or _boundaries(layout, spans)
+        return {'name': layout['name'], 'boundaries': boundaries}
+    return None
+
+
+def extract_layout_table(words, detected, rules=None):
+    """
+    Extract a page's table from its words using fixed column boundaries.
+
+    The result has the same shape as page.extract_table(): the header row
+    (when the page repeats it) followed by one list of cell strings per
+    transaction. Lines continuing a wrapped cell are joined with a newline.
+
+    A wrapped line must follow the row's previous line within WRAP_GAP line
+    heights, and nothing below the table's bottom rule is read, so page
+    footers are not taken for part of the last transaction.
+
+    Args:
+        words: page_words() of the page
+        detected: Result of detect_layout for the statement
+        rules: page_rules() of the page, if the table is ruled
+
+    Returns:
+        List of rows, or None if the page has no transactions or header
+    """
+    layout = get_layout(detected['name'])
+    boundaries = detected['boundaries']
+    columns = layout['columns']
+
+    lines = _lines(words)
+    table = []
+    header_top = None
+    found = _find_header(lines, columns)
+    if found is not None:
+        table.append(list(columns))
+        header_top = lines[found[0]][0]['top']
+        lines = lines[found[0] + 1:]
+    bottom = _table_bottom(rules or [], boundaries, header_top)
+
+    # Bottom of the last line of the row being built; None when no row is open
+    row_bottom = None
+    for line in lines:
+        line_top = min(word['top'] for word in line)
+        line_bottom = max(word['bottom'] for word in line)
+        if bottom is not None and line_top > bottom:
+            break
+
+        cells = [[] for _ in columns]
+        for word in line:
+            center = (word['x0'] + word['x1']) / 2
+            cells[bisect.bisect(boundaries, center)].append(word['text'])
+        cells = [' '.join(cell) for cell in cells]
+
+        if layout['row_start'].fullmatch(cells[0]):
+            table.append(cells)
+            row_bottom = line_bottom
+        elif (row_bottom is not None
+              and line_top - row_bottom <= WRAP_GAP * (line_bottom - line_top)
+              and all(not cell for i, cell in enumerate(cells) if i not in layout['wrap_columns'])):
+            # Continuation of a wrapped cell in the previous row
+            previous = table[-1]
+            for i in layout['wrap_columns']:
+                if cells[i]:
+                    previous[i] = f"{previous[i]}\n{cells[i]}" if previous[i] else cells[i]
+            row_bottom = line_bottom
+        else:
+            # Not part of a transaction, so later lines cannot continue one either
+            row_bottom = None
+
+    return table or None
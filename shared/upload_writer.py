@@ -0,0 +1,48 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from shared_instances import SharedInstances
+
+_writers = SharedInstances()
+
+
+def _write(data, path):
+    """Write data to path through a temporary file, so path is never partially written."""
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
+
+
+def save_upload(data, path):
+    """
+    Write an uploaded file to disk in the background.
+
+    The request goes on with the bytes already in memory; the file is only
+    needed later, for downloads and re-extraction.
+
+    Args:
+        data: Contents of the upload, as bytes or a memoryview
+        path: Destination file
+
+    Returns:
+        concurrent.futures.Future resolving to path once it is written
+    """
+    # One writer: uploads are written in the order they arrive
+    writer = _writers.get(
+        lambda: ThreadPoolExecutor(max_workers=1, thread_name_prefix='upload-writer'))
+    future = writer.submit(_write, data, path)
+    future.add_done_callback(_report_failure)
+    return future
+
+
+def _report_failure(future):
+    if future.exception() is not None:
+        print(f"Error saving upload: {future.exception()}")